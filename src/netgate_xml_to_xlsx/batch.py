@@ -0,0 +1,166 @@
+"""Batch processing of multiple input files."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import logging
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler
+from pathlib import Path
+
+from .cache import ResultCache
+from .logging import custom_log_level
+from .pfsense import PfSense, report_paths
+from .plugin_tools import discover_plugins
+
+# Log records emitted by the current worker process.
+_RECORDS: queue.SimpleQueue = queue.SimpleQueue()
+
+
+class FileResult:
+    """Outcome of processing a single input file."""
+
+    def __init__(
+        self, in_filename: Path, ok: bool, records: list[logging.LogRecord]
+    ) -> None:
+        """
+        File result.
+
+        Args:
+            in_filename:
+                Input file processed.
+
+            ok:
+                True if the file was processed without error.
+
+            records:
+                Log records generated while processing the file.
+
+        """
+        self.in_filename = in_filename
+        self.ok = ok
+        self.records = records
+
+
+def join_paths(output_paths: dict[str, Path]) -> str:
+    """Return the output paths for logging."""
+    return ", ".join(str(x) for x in output_paths.values())
+
+
+def process_file(config: dict, in_filename: Path) -> None:
+    """Sanitize or convert a single input file."""
+    logger = logging.getLogger()
+    args = config["args"]
+
+    logger.info(f"Processing: {in_filename}")
+
+    if args.sanitize:
+        PfSense(config, in_filename).sanitize(config["plugins"])
+        return
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = ResultCache(args.cache_dir, args.cache_size * 1024 * 1024)
+        output_paths = report_paths(args, in_filename)
+        keys = {x: cache.key(config, in_filename, x) for x in output_paths}
+        if all(cache.get(keys[x], y) for x, y in output_paths.items()):
+            logger.info(f"Output path: {join_paths(output_paths)} (cached).")
+            return
+
+    pfsense = PfSense(config, in_filename, cache)
+    output = "stdout" if args.stdout else join_paths(pfsense.output_paths)
+    logger.info(f"Output path: {output}.")
+    pfsense.run_all_plugins(config["plugins"])
+    pfsense.report_stats()
+    pfsense.write_profiles()
+
+    if cache is not None:
+        for output_format, output_path in pfsense.output_paths.items():
+            cache.put(keys[output_format], output_path)
+        cache.evict()
+
+
+def _init_worker(log_level: int) -> None:
+    """
+    Initialize worker process logging.
+
+    Records are queued and returned to the parent process instead of being
+    written by the worker, so output is not interleaved between files.
+    """
+    custom_log_level()
+    logger = logging.getLogger()
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(_RECORDS))
+    logger.setLevel(log_level)
+
+    # Forked workers inherit the parent's plugin registry.
+    # Others build their registry once here rather than per file.
+    discover_plugins()
+
+
+def _drain_records() -> list[logging.LogRecord]:
+    """Remove and return all queued log records."""
+    records = []
+    while not _RECORDS.empty():
+        records.append(_RECORDS.get_nowait())
+    return records
+
+
+def _run_file(config: dict, in_filename: Path) -> FileResult:
+    """Process one file in a worker and gather the result."""
+    _drain_records()
+    ok = True
+    try:
+        process_file(config, in_filename)
+    except Exception as err:  # pylint: disable=broad-except
+        # Report the failure and carry on with the remaining files.
+        logging.getLogger().exception(f"Failed: {in_filename}. {err}")
+        ok = False
+
+    return FileResult(in_filename, ok, _drain_records())
+
+
+def run_batch(config: dict, in_files: list[Path], jobs: int) -> list[FileResult]:
+    """
+    Process input files in a pool of worker processes.
+
+    Each worker owns its PfSense and output format instances.
+    Worker log records are replayed in the parent in input file order,
+    so the log is identical regardless of completion order.
+
+    Args:
+        config:
+            Plugin configuration including parsed arguments.
+
+        in_files:
+            Files to process.
+
+        jobs:
+            Number of worker processes. 0 uses all CPUs.
+
+    Returns:
+        One FileResult per input file, in input file order.
+
+    """
+    logger = logging.getLogger()
+    max_workers = min(jobs or os.cpu_count() or 1, len(in_files))
+    logger.info(f"Processing {len(in_files)} files using {max_workers} workers.")
+
+    # Build the registry before the workers are created so they can share it.
+    discover_plugins()
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(logger.getEffectiveLevel(),),
+    ) as executor:
+        futures = [executor.submit(_run_file, config, x) for x in in_files]
+        for future in futures:
+            result = future.result()
+            for record in result.records:
+                logger.handle(record)
+            results.append(result)
+
+    return results
@@ -0,0 +1,300 @@
+"""Cache of generated reports and plugin sheets keyed on input content."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from importlib.metadata import version
+from pathlib import Path
+from typing import Callable
+
+from lxml import etree  # nosec
+
+from netgate_xml_to_xlsx.mytypes import Node
+
+from .formats import FILENAME_FORMATS
+from .sheetdata import SheetData
+
+# Read size when hashing input files.
+CHUNK_SIZE = 1024 * 1024
+
+# Format of sheet entries. Increment when SheetData or its encoding changes.
+SHEETS_SCHEMA = 2
+
+
+def file_hash(path: Path) -> str:
+    """Return the sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def update_section_hashes(hashes: dict, section: Node) -> None:
+    """
+    Add a top-level section to the hash of its tag.
+
+    The canonical (C14N) form is hashed so formatting differences
+    such as attribute order and empty element style do not change the hash.
+    Sections repeating the same tag (such as cert) are hashed together, in order.
+
+    Args:
+        hashes: Dictionary of tag: sha256 hash object.
+
+        section: Top-level section.
+
+    """
+    if section.tag not in hashes:
+        hashes[section.tag] = hashlib.sha256()
+    hashes[section.tag].update(etree.tostring(section, method="c14n", with_tail=False))
+
+
+def sheets_to_json(sheets: list[SheetData]) -> str:
+    """
+    Encode sheets as JSON.
+
+    Raises:
+        TypeError: A value is not a JSON type.
+
+    """
+    return json.dumps(
+        [
+            {
+                "sheet_name": x.sheet_name,
+                "header_row": list(x.header_row),
+                "data_rows": [list(row) for row in x.data_rows],
+                "column_widths": x.column_widths,
+                "ok_to_rotate": x.ok_to_rotate,
+            }
+            for x in sheets
+        ],
+        ensure_ascii=False,
+    )
+
+
+def sheets_from_json(text: str) -> list[SheetData]:
+    """
+    Decode sheets encoded by sheets_to_json.
+
+    Raises:
+        ValueError: Not valid JSON.
+
+        KeyError, TypeError: Not encoded sheets.
+
+    """
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise TypeError(f"Expected a list of sheets, not {type(data).__name__}.")
+    return [SheetData(**x) for x in data]
+
+
+class ResultCache:
+    """
+    Reports cached by input file hash, tool version, configuration and output format.
+
+    Each report entry is a copy of a report named by its key.
+    Sheet entries (<key>.sheets) hold the sheets of a single plugin as JSON,
+    keyed by the hashes of the top-level sections the plugin reads.
+    Entry modification times record last use.
+    The least recently used entries are removed once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int) -> None:
+        """
+        Initialize result cache.
+
+        Args:
+            cache_dir:
+                Directory holding cached reports. Created if required.
+
+            max_bytes:
+                Maximum total size of cached reports.
+
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, config: dict, input_path: Path, output_format: str) -> str:
+        """
+        Generate the cache key for a file's report in one output format.
+
+        Args:
+            config: Configuration loaded from plugins.toml, including parsed arguments.
+
+            input_path: Input file.
+
+            output_format: Output format of the report.
+
+        Returns:
+            Key.
+
+        """
+        args = config["args"]
+        settings = {k: v for k, v in config.items() if k != "args"}
+        parts = (
+            file_hash(input_path),
+            version("netgate_xml_to_xlsx"),
+            json.dumps(settings, sort_keys=True, default=str),
+            output_format,
+            str(args.compress),
+        )
+        if output_format in FILENAME_FORMATS:
+            # The report records the file name, so identical files differ.
+            parts = (*parts, input_path.name)
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, output_path: Path) -> bool:
+        """
+        Copy a cached report to output_path.
+
+        Args:
+            key: Cache key.
+
+            output_path: Report to create.
+
+        Returns:
+            True if the report was cached.
+
+        """
+        entry = self.cache_dir / key
+        try:
+            shutil.copyfile(entry, output_path)
+        except FileNotFoundError:
+            return False
+
+        # Mark as recently used.
+        entry.touch()
+        return True
+
+    def put(self, key: str, report_path: Path) -> None:
+        """
+        Add a report to the cache.
+
+        Args:
+            key: Cache key.
+
+            report_path: Report to cache.
+
+        """
+        self._store(key, lambda x: shutil.copyfile(report_path, x))
+
+    def sheets_key(
+        self, plugin_name: str, sections: set[str] | None, hashes: dict
+    ) -> str:
+        """
+        Generate the cache key for a plugin's sheets.
+
+        Args:
+            plugin_name: Plugin.
+
+            sections: Top-level tags the plugin reads. None if unknown (all tags).
+
+            hashes: Dictionary of tag: sha256 hash object for the document.
+
+        Returns:
+            Key.
+
+        """
+        tags = sorted(hashes if sections is None else sections)
+        parts = [version("netgate_xml_to_xlsx"), str(SHEETS_SCHEMA), plugin_name]
+        parts.extend(
+            f"{x}:{hashes[x].hexdigest() if x in hashes else ''}" for x in tags
+        )
+        digest = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+        return f"{digest}.sheets"
+
+    def get_sheets(self, key: str) -> list[SheetData] | None:
+        """
+        Load a plugin's cached sheets.
+
+        Args:
+            key: Cache key from sheets_key.
+
+        Returns:
+            Sheets or None if not cached or the entry cannot be read.
+
+        """
+        entry = self.cache_dir / key
+        try:
+            text = entry.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        except (OSError, ValueError) as err:
+            self.logger.debug(f"Cannot read cached sheets {key}: {err}.")
+            return None
+
+        try:
+            sheets = sheets_from_json(text)
+        except (KeyError, TypeError, ValueError) as err:
+            # Unreadable, or written by an incompatible version. Rerun the plugin.
+            self.logger.debug(f"Ignoring cached sheets {key}: {err}.")
+            return None
+
+        entry.touch()
+        return sheets
+
+    def put_sheets(self, key: str, sheets: list[SheetData]) -> None:
+        """
+        Add a plugin's sheets to the cache.
+
+        Args:
+            key: Cache key from sheets_key.
+
+            sheets: Sheets output by the plugin.
+
+        """
+        try:
+            text = sheets_to_json(sheets)
+        except (TypeError, ValueError) as err:
+            self.logger.debug(f"Cannot cache sheets: {err}.")
+            return
+        self._store(key, lambda x: Path(x).write_text(text, encoding="utf-8"))
+
+    def _store(self, key: str, write: Callable[[str], object]) -> None:
+        """
+        Write an entry.
+
+        The entry is written to a temporary file and renamed into place so
+        concurrent processes never see a partial entry.
+
+        Args:
+            key: Cache key.
+
+            write: Function writing the entry to the given filename.
+
+        """
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        os.close(fd)
+        try:
+            write(tmp_name)
+            os.replace(tmp_name, self.cache_dir / key)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Evicted by another process.
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(x[1] for x in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            self.logger.debug(f"Evicted cached report: {entry.name}.")
@@ -0,0 +1,232 @@
+"""Structural difference between two configuration files."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import logging
+from pathlib import Path
+
+from lxml import etree  # nosec
+
+from netgate_xml_to_xlsx.mytypes import Node
+
+from .cache import update_section_hashes
+from .formats import get_format
+from .loader import load_xml, parser_options
+from .plugin_tools import discover_plugins, index_nodes, plugin_sections, plugins_to_run
+from .sheetdata import SheetData
+
+# Columns used to align rows between configurations, in order of preference.
+# The first column is used if a sheet has none of these.
+KEY_COLUMNS = ("tracker", "refid", "uuid", "id", "name", "descr")
+
+DIFF_HEADER = ["change", "key", "field", "old", "new"]
+DIFF_WIDTHS = [12, 40, 30, 60, 60]
+
+
+def section_hashes(parsed_xml: Node) -> dict[str, str]:
+    """Return tag: hash of each top-level section."""
+    hashes: dict = {}
+    for section in parsed_xml.iterchildren(etree.Element):
+        update_section_hashes(hashes, section)
+    return {k: v.hexdigest() for k, v in hashes.items()}
+
+
+def key_column(header_row: list[str]) -> int:
+    """Return the index of the column used to align rows."""
+    for name in KEY_COLUMNS:
+        if name in header_row:
+            return header_row.index(name)
+    return 0
+
+
+def keyed_rows(sheet_data: SheetData) -> dict[str, dict[str, str]]:
+    """
+    Index a sheet's rows by key.
+
+    Repeated keys are numbered in order of appearance.
+
+    Args:
+        sheet_data: Sheet to index.
+
+    Returns:
+        Dictionary of key: {header: value}.
+
+    """
+    header_row = sheet_data.header_row
+    column = key_column(header_row)
+    rows: dict[str, dict[str, str]] = {}
+    for row in sheet_data.data_rows:
+        key = str(row[column]) if column < len(row) else ""
+        if key in rows:
+            count = 2
+            while f"{key} ({count})" in rows:
+                count += 1
+            key = f"{key} ({count})"
+        rows[key] = dict(zip(header_row, (str(x) for x in row)))
+    return rows
+
+
+def diff_sheet(
+    sheet_name: str, old: SheetData | None, new: SheetData | None
+) -> SheetData:
+    """
+    Compare two versions of a sheet.
+
+    Args:
+        sheet_name: Name of the sheet.
+
+        old: Sheet from the old configuration, if any.
+
+        new: Sheet from the new configuration, if any.
+
+    Returns:
+        Sheet of added, removed and changed fields.
+
+    """
+    old_rows = keyed_rows(old) if old is not None else {}
+    new_rows = keyed_rows(new) if new is not None else {}
+
+    data_rows: list[list[str]] = []
+    for key, old_row in old_rows.items():
+        if key not in new_rows:
+            data_rows.extend(
+                ["removed", key, field, value, ""]
+                for field, value in old_row.items()
+                if value
+            )
+            continue
+        new_row = new_rows[key]
+        for field in dict.fromkeys([*old_row, *new_row]):
+            if (old_value := old_row.get(field, "")) != (
+                new_value := new_row.get(field, "")
+            ):
+                data_rows.append(["changed", key, field, old_value, new_value])
+
+    for key, new_row in new_rows.items():
+        if key not in old_rows:
+            data_rows.extend(
+                ["added", key, field, "", value]
+                for field, value in new_row.items()
+                if value
+            )
+
+    return SheetData(
+        sheet_name=sheet_name,
+        header_row=DIFF_HEADER[:],
+        data_rows=data_rows,
+        column_widths=DIFF_WIDTHS[:],
+        ok_to_rotate=False,
+    )
+
+
+class ConfigDiff:
+    """Compare the plugin output of two configuration files."""
+
+    def __init__(self, config: dict, old_path: Path, new_path: Path) -> None:
+        """
+        Load both configurations.
+
+        Args:
+            config: Configuration loaded from plugins.toml, including parsed arguments.
+
+            old_path: Original configuration file.
+
+            new_path: Changed configuration file.
+
+        """
+        self.config = config
+        self.args = config["args"]
+        self.old_path = old_path
+        self.new_path = new_path
+        self.plugins = discover_plugins()
+        self.logger = logging.getLogger()
+
+        options = parser_options(config)
+        self.old_xml = load_xml(old_path, options)
+        self.new_xml = load_xml(new_path, options)
+
+        self.output_path = Path(self.args.output_dir) / Path(
+            f"{old_path.name}--{new_path.name}.DIFF.{self.args.output_format}"
+        )
+
+    def changed_sections(self) -> set[str]:
+        """Return the top-level tags whose content differs."""
+        old_hashes = section_hashes(self.old_xml)
+        new_hashes = section_hashes(self.new_xml)
+        return {
+            x
+            for x in old_hashes.keys() | new_hashes.keys()
+            if old_hashes.get(x) != new_hashes.get(x)
+        }
+
+    def plugin_sheets(self, plugin_name: str, parsed_xml: Node) -> dict[str, SheetData]:
+        """Run a plugin on one configuration and return its sheets by name."""
+        if not plugins_to_run([plugin_name], index_nodes(parsed_xml)):
+            return {}
+        plugin = self.plugins[plugin_name]
+        if plugin_name.startswith("report"):
+            sheets = plugin.run(parsed_xml, self.plugins)
+        else:
+            sheets = plugin.run(parsed_xml)
+        return {x.sheet_name: x for x in sheets}
+
+    def run(self, plugin_names: list[str]) -> list[SheetData]:
+        """
+        Compare the sheets of the plugins that read changed sections.
+
+        Plugins only reading unchanged sections are not run.
+
+        Args:
+            plugin_names: Plugins to compare, in output order.
+
+        Returns:
+            Summary sheet followed by one sheet of differences per changed sheet.
+
+        """
+        changed = self.changed_sections()
+        self.logger.info(
+            f"""Changed sections: {",".join(sorted(changed)) or "none"}."""
+        )
+
+        summary_rows = []
+        diffs = []
+        for plugin_name in plugin_names:
+            sections = plugin_sections(plugin_name)
+            if not changed or (sections is not None and not sections & changed):
+                continue
+            if self.args.verbose:
+                self.logger.info(f"Plugin: {plugin_name}")
+            old_sheets = self.plugin_sheets(plugin_name, self.old_xml)
+            new_sheets = self.plugin_sheets(plugin_name, self.new_xml)
+            for sheet_name in dict.fromkeys([*old_sheets, *new_sheets]):
+                sheet_diff = diff_sheet(
+                    sheet_name, old_sheets.get(sheet_name), new_sheets.get(sheet_name)
+                )
+                if not sheet_diff.data_rows:
+                    continue
+                diffs.append(sheet_diff)
+                counts = {x: 0 for x in ("added", "removed", "changed")}
+                for row in sheet_diff.data_rows:
+                    counts[row[0]] += 1
+                summary_rows.append([sheet_name, *(str(x) for x in counts.values())])
+
+        if not summary_rows:
+            summary_rows.append(["No differences.", "0", "0", "0"])
+        summary = SheetData(
+            sheet_name="Summary",
+            header_row=["sheet", "added fields", "removed fields", "changed fields"],
+            data_rows=summary_rows,
+            column_widths=[40, 20, 20, 20],
+            ok_to_rotate=False,
+        )
+        return [summary, *diffs]
+
+    def write(self, plugin_names: list[str]) -> None:
+        """Compare and write the differences in the requested output format."""
+        output_format = get_format(self.args.output_format)(
+            ctx={"input_path": self.new_path, "output_path": self.output_path}
+        )
+        output_format.start()
+        for sheet_data in self.run(plugin_names):
+            output_format.out(sheet_data)
+        output_format.finish()
+        self.logger.info(f"Differences written: {self.output_path}.")
@@ -0,0 +1,226 @@
+"""Consolidated report of many firewalls."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .formats import COMPRESSION, TEXT_FORMATS, create_format
+from .formats.sqlite import FIREWALL_COLUMN
+from .pfsense import PfSense
+from .sheetdata import SheetData
+
+FIREWALL_WIDTH = 30
+
+
+def column_positions(columns: list[str], header_row: list[str]) -> list[int]:
+    """
+    Map each header to its position in the consolidated columns.
+
+    Headers not yet in columns are appended.
+    A header repeated within a row maps to its repeated column.
+
+    Args:
+        columns: Consolidated columns. Updated in place.
+
+        header_row: Header row of one firewall's sheet.
+
+    Returns:
+        Position in columns of each header.
+
+    """
+    positions = []
+    seen: dict[str, int] = {}
+    for header in header_row:
+        occurrence = seen[header] = seen.get(header, 0) + 1
+        matches = [i for i, x in enumerate(columns) if x == header]
+        if len(matches) < occurrence:
+            columns.append(header)
+            matches.append(len(columns) - 1)
+        positions.append(matches[occurrence - 1])
+    return positions
+
+
+class SpooledRows:
+    """
+    Consolidated rows read back from a spool file.
+
+    Rows spooled before later columns were added are padded with empty values.
+    """
+
+    def __init__(self, spool_path: Path, row_count: int, width: int) -> None:
+        """
+        Spooled rows.
+
+        Args:
+            spool_path: File of JSON encoded rows, one per line.
+
+            row_count: Number of rows in the file.
+
+            width: Number of columns in the consolidated sheet.
+
+        """
+        self.spool_path = spool_path
+        self.row_count = row_count
+        self.width = width
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __iter__(self) -> Iterator[list[str]]:
+        with open(self.spool_path, encoding="utf-8") as fh:
+            for line in fh:
+                row = json.loads(line)
+                row.extend([""] * (self.width - len(row)))
+                yield row
+
+
+class FleetSheet:
+    """Columns and spooled rows of one consolidated sheet."""
+
+    def __init__(self, sheet_name: str, spool_path: Path) -> None:
+        """
+        Fleet sheet.
+
+        Args:
+            sheet_name: Name of the sheet.
+
+            spool_path: File to spool rows to.
+
+        """
+        self.sheet_name = sheet_name
+        self.spool_path = spool_path
+        self.columns: list[str] = []
+        self.widths: dict[int, int] = {}
+        self.row_count = 0
+
+    def add(self, firewall: str, sheet_data: SheetData) -> None:
+        """Spool a firewall's rows, aligned to the consolidated columns."""
+        positions = column_positions(self.columns, sheet_data.header_row)
+        for position, width in zip(positions, sheet_data.column_widths):
+            self.widths[position] = max(width, self.widths.get(position, 0))
+
+        with open(self.spool_path, "a", encoding="utf-8") as fh:
+            for row in sheet_data.data_rows:
+                values = [""] * (max(positions, default=-1) + 1)
+                for position, value in zip(positions, row):
+                    values[position] = value
+                fh.write(json.dumps([firewall, *values], default=str) + "\n")
+                self.row_count += 1
+
+    def sheet_data(self) -> SheetData:
+        """Return the consolidated sheet, reading its rows from the spool."""
+        return SheetData(
+            sheet_name=self.sheet_name,
+            header_row=[FIREWALL_COLUMN, *self.columns],
+            data_rows=SpooledRows(
+                self.spool_path, self.row_count, len(self.columns) + 1
+            ),
+            column_widths=[
+                FIREWALL_WIDTH,
+                *(self.widths.get(x, 20) for x in range(len(self.columns))),
+            ],
+            ok_to_rotate=False,
+        )
+
+
+class FleetReport:
+    """
+    Consolidate the sheets of many firewalls into one report.
+
+    Each sheet holds the rows of all firewalls, preceded by a firewall column.
+    Rows are spooled to temporary files as each firewall is converted
+    and the report is written once all firewalls are added,
+    so memory does not grow with the number of firewalls.
+    """
+
+    def __init__(self, config: dict) -> None:
+        """
+        Initialize fleet report.
+
+        Args:
+            config: Configuration loaded from plugins.toml, including parsed arguments.
+
+        """
+        self.args = config["args"]
+        self.output_paths: dict[str, Path] = {}
+        for output_format in self.args.output_format:
+            suffix = ""
+            if output_format in TEXT_FORMATS:
+                suffix = COMPRESSION.get(self.args.compress, "")
+            self.output_paths[output_format] = Path(self.args.output_dir) / Path(
+                f"{self.args.fleet}.FLEET.{output_format}{suffix}"
+            )
+        self.spool_dir = tempfile.TemporaryDirectory(
+            prefix=".fleet-", dir=self.args.output_dir
+        )
+        self.sheets: dict[str, FleetSheet] = {}
+        self.logger = logging.getLogger()
+
+    def add(self, firewall: str, sheets: Iterable[SheetData]) -> None:
+        """
+        Add one firewall's sheets.
+
+        Args:
+            firewall: Firewall name written in the firewall column.
+
+            sheets: Sheets output by the plugins.
+
+        """
+        for sheet_data in sheets:
+            if (fleet_sheet := self.sheets.get(sheet_data.sheet_name)) is None:
+                spool_path = Path(self.spool_dir.name) / f"{len(self.sheets)}.jsonl"
+                fleet_sheet = FleetSheet(sheet_data.sheet_name, spool_path)
+                self.sheets[sheet_data.sheet_name] = fleet_sheet
+            fleet_sheet.add(firewall, sheet_data)
+
+    def write(self) -> None:
+        """Write the consolidated report and remove the spool files."""
+        try:
+            output_format = create_format(
+                self.output_paths,
+                ctx={
+                    # Write xlsx sheets as they are output.
+                    "stream": True,
+                    "compress": self.args.compress,
+                    "flush_rows": self.args.flush_rows,
+                    "stdout": self.args.stdout,
+                },
+                writer_threads=self.args.writer_threads,
+            )
+            output_format.start()
+            try:
+                for fleet_sheet in self.sheets.values():
+                    output_format.out(fleet_sheet.sheet_data())
+            finally:
+                output_format.finish()
+        finally:
+            self.spool_dir.cleanup()
+
+
+def run_fleet(config: dict, in_files: list[Path]) -> None:
+    """
+    Convert input files, one at a time, into a single consolidated report.
+
+    Args:
+        config: Configuration loaded from plugins.toml, including parsed arguments.
+
+        in_files: Files to convert.
+
+    """
+    logger = logging.getLogger()
+    args = config["args"]
+    fleet = FleetReport(config)
+    output = ", ".join(str(x) for x in fleet.output_paths.values())
+    logger.info(f"Output path: {'stdout' if args.stdout else output}.")
+
+    for in_filename in in_files:
+        logger.info(f"Processing: {in_filename}")
+        pfsense = PfSense(config, in_filename)
+        fleet.add(pfsense.input_path.name, pfsense.iter_sheets(config["plugins"]))
+        pfsense.report_stats()
+        pfsense.write_profiles()
+
+    fleet.write()
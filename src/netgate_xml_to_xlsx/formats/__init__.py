@@ -1,7 +1,85 @@
 """Formats module."""
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
-from .text import TextFormat  # NOQA
-from .xlsx import XlsxFormat  # NOQA
+import importlib
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base_format import BaseFormat
+
+# Output format name: (module, class name).
+# Modules are only imported when the format is used so that, for example,
+# openpyxl is not loaded unless xlsx output is requested.
+FORMATS: dict[str, tuple[str, str]] = {
+    "txt": (".text", "TextFormat"),
+    "xlsx": (".xlsx", "XlsxFormat"),
+    "sqlite": (".sqlite", "SqliteFormat"),
+    "parquet": (".parquet", "ParquetFormat"),
+    "jsonl": (".jsonl", "JsonlFormat"),
+}
+
+# Output formats supporting compression.
+TEXT_FORMATS = ("txt", "jsonl")
+
+# Output formats recording the input file name in the report.
+FILENAME_FORMATS = ("sqlite", "parquet", "jsonl")
+
+# Output formats of the diff command.
+DIFF_FORMATS = ("txt", "xlsx")
+
+# Text output compression: file suffix.
+COMPRESSION: dict[str, str] = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def get_format(name: str) -> type["BaseFormat"]:
+    """Import and return the output format class."""
+    module_name, class_name = FORMATS[name]
+    module = importlib.import_module(module_name, __name__)
+    return getattr(module, class_name)
+
+
+def create_format(
+    output_paths: dict[str, Path], ctx: dict, writer_threads: bool = False
+) -> "BaseFormat":
+    """
+    Create the output format for one or more output files.
+
+    Args:
+        output_paths: Output format name: output path.
+
+        ctx: Context shared by all formats. Compression only applies to text formats.
+
+        writer_threads: Write each format on its own thread when there is more than one.
+
+    Returns:
+        The output format, or a FanoutFormat forwarding to each format.
+
+    """
+    output_formats = []
+    for name, output_path in output_paths.items():
+        format_ctx = {**ctx, "output_path": output_path}
+        if name not in TEXT_FORMATS:
+            format_ctx["compress"] = None
+        output_formats.append(get_format(name)(ctx=format_ctx))
+
+    if len(output_formats) == 1:
+        return output_formats[0]
+
+    from .fanout import FanoutFormat
+
+    return FanoutFormat(output_formats, threaded=writer_threads)
+
+
+def __getattr__(name: str) -> type["BaseFormat"]:
+    """Support `from .formats import TextFormat` without eager imports."""
+    for format_name, (_, class_name) in FORMATS.items():
+        if class_name == name:
+            return get_format(format_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__: list = []
@@ -43,19 +43,14 @@ class BaseFormat(ABC):
 
         Set header_row to "name,data,..."
         Calculate proper number of column widths and header columns.
+        The rotated SheetData is a view of data's rows rather than a copy,
+        so data shared with other formats is unchanged.
 
         """
         if not len(data.data_rows):
             # No data to process.
             return data
-        data.data_rows = list(zip(data.header_row, *data.data_rows))
-
-        data.header_row = ["name"]
-        data.header_row.extend(["data" for x in range(len(data.data_rows[0]) - 1)])
-        data.column_widths = [60]
-        data.column_widths.extend([80 for x in range(len(data.data_rows[0]) - 1)])
-
-        return data
+        return data.rotated()
 
     def check_row_length(self, row: list[str]) -> None:
         """Log warnings for any unmatched header_row/row lengths."""
@@ -0,0 +1,128 @@
+"""Fan-out Format"""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import logging
+import queue
+import threading
+
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+from .base_format import BaseFormat
+
+# Sheets waiting for each writer thread before out() blocks.
+WRITER_QUEUE_SIZE = 8
+
+
+class FanoutFormat(BaseFormat):
+    """
+    Forward each sheet to several output formats.
+
+    Sheets are shared between the formats, which must not modify them.
+    When threaded, each format runs start, out and finish on its own writer thread,
+    fed through a bounded queue so a slow writer limits how far ahead plugins run.
+    """
+
+    def __init__(
+        self,
+        output_formats: list[BaseFormat],
+        threaded: bool = False,
+        queue_size: int = WRITER_QUEUE_SIZE,
+    ) -> None:
+        """
+        Initialize fan-out format.
+
+        Args:
+            output_formats: Formats receiving every sheet.
+
+            threaded: Run each format on its own writer thread.
+
+            queue_size: Maximum sheets queued for each writer thread.
+
+        """
+        self.output_formats = output_formats
+        self.threaded = threaded
+        self.queues: list[queue.Queue] = []
+        self.threads: list[threading.Thread] = []
+        self.errors: list[BaseException] = []
+        self.queue_size = queue_size
+        self.logger = logging.getLogger()
+
+    def start(self) -> None:
+        """Start each format, or each format's writer thread."""
+        if not self.threaded:
+            for output_format in self.output_formats:
+                output_format.start()
+            return
+
+        for output_format in self.output_formats:
+            sheets: queue.Queue = queue.Queue(maxsize=self.queue_size)
+            thread = threading.Thread(
+                target=self._writer, args=(output_format, sheets), daemon=True
+            )
+            self.queues.append(sheets)
+            self.threads.append(thread)
+            thread.start()
+
+    def out(self, sheet_data: SheetData) -> None:
+        """Forward a sheet to each format."""
+        if not self.threaded:
+            for output_format in self.output_formats:
+                output_format.out(sheet_data)
+            return
+
+        if self.errors:
+            # Let the other writers finish their files before raising.
+            self._stop_writers()
+            self._raise_error()
+        for sheets in self.queues:
+            sheets.put(sheet_data)
+
+    def finish(self) -> None:
+        """
+        Finish each format, waiting for the writer threads if threaded.
+
+        Every format is finished, even after an error, before the first error is raised.
+        Safe to call after out() has raised.
+        """
+        if not self.threaded:
+            for output_format in self.output_formats:
+                try:
+                    output_format.finish()
+                except Exception as err:  # pylint: disable=broad-except
+                    self.errors.append(err)
+            self._raise_error()
+            return
+
+        self._stop_writers()
+        self._raise_error()
+
+    def _stop_writers(self) -> None:
+        """Close each writer thread's queue and wait for the threads to finish."""
+        for sheets in self.queues:
+            sheets.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.queues = []
+        self.threads = []
+
+    def _writer(self, output_format: BaseFormat, sheets: queue.Queue) -> None:
+        """
+        Write queued sheets until the closing None.
+
+        After an error the remaining sheets are discarded
+        so out() never blocks on a full queue.
+        """
+        try:
+            output_format.start()
+            while (sheet_data := sheets.get()) is not None:
+                output_format.out(sheet_data)
+            output_format.finish()
+        except BaseException as err:  # pylint: disable=broad-except
+            self.errors.append(err)
+            while sheets.get() is not None:
+                pass
+
+    def _raise_error(self) -> None:
+        """Re-raise the first writer thread error in the calling thread."""
+        if self.errors:
+            raise self.errors[0]
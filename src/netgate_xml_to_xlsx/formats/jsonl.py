@@ -0,0 +1,91 @@
+"""JSON Lines Format"""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import TextIO
+
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+from .base_format import BaseFormat
+from .text import open_text
+
+
+def unique_keys(header_row: list[str]) -> list[str]:
+    """Return the header names with repeated names numbered (descr, descr_2)."""
+    keys: list[str] = []
+    for header in header_row:
+        key = str(header)
+        count = 2
+        while key in keys:
+            key = f"{header}_{count}"
+            count += 1
+        keys.append(key)
+    return keys
+
+
+class JsonlFormat(BaseFormat):
+    """
+    JSON Lines format.
+
+    Each data row is written as it is output, one JSON object per line:
+        {"file": input filename, "sheet": sheet name, "data": {header: value}}
+    "file" is omitted when there is no single input file (--fleet).
+
+    Output is flushed after each section, or every ctx["flush_rows"] rows if set.
+    ctx["compress"] optionally compresses the output (gzip or zstd).
+    ctx["stdout"] writes to standard output instead of ctx["output_path"].
+    """
+
+    def __init__(self, ctx: dict) -> None:
+        self.ctx = ctx
+        self.output_fh: TextIO | None = None
+        self.flush_rows: int = ctx.get("flush_rows") or 0
+        input_path = ctx.get("input_path")
+        self.prefix = {} if input_path is None else {"file": Path(input_path).name}
+        self.sheet_data = SheetData()
+
+        self.logger = logging.getLogger()
+        self.header_row_length = 0
+        self.logged_row_length_warning = False
+
+    def start(self) -> None:
+        """Create output file."""
+        if self.ctx.get("stdout"):
+            self.output_fh = sys.stdout
+            return
+        self.output_fh = open_text(self.ctx["output_path"], self.ctx.get("compress"))
+
+    def out(self, sheet_data: SheetData) -> None:
+        """Write one JSON object per data row."""
+        if not len(sheet_data.data_rows):
+            # Nothing to write
+            return
+
+        self.logged_row_length_warning = False
+        self.header_row_length = len(sheet_data.header_row)
+        self.sheet_data = sheet_data
+
+        fh = self.output_fh
+        assert fh is not None, "start() not called."
+        keys = unique_keys(sheet_data.header_row)
+        record = {**self.prefix, "sheet": sheet_data.sheet_name, "data": {}}
+        for row_num, row in enumerate(sheet_data.data_rows, start=1):
+            self.check_row_length(row)
+            record["data"] = dict(zip(keys, row))
+            fh.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            if self.flush_rows and not row_num % self.flush_rows:
+                fh.flush()
+
+        fh.flush()
+
+    def finish(self) -> None:
+        """Close the output file."""
+        fh = self.output_fh
+        assert fh is not None, "start() not called."
+        if fh is sys.stdout:
+            fh.flush()
+            return
+        fh.close()
@@ -0,0 +1,121 @@
+"""Parquet Format"""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from netgate_xml_to_xlsx.errors import ScriptError
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+from .base_format import BaseFormat
+from .sqlite import FIREWALL_COLUMN, identifier
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Highly repetitive columns stored as Arrow dictionaries.
+DICTIONARY_COLUMNS = (
+    FIREWALL_COLUMN,
+    "interface",
+    "ipprotocol",
+    "protocol",
+    "type",
+)
+
+
+class ParquetFormat(BaseFormat):
+    """
+    Parquet format.
+
+    The output path is a directory holding one <sheet>.parquet file per sheet,
+    named as for the sqlite format. All columns are strings.
+    Unless the sheet already has one, a leading firewall column
+    holds the input filename.
+    Requires the optional pyarrow package.
+    """
+
+    def __init__(self, ctx: dict) -> None:
+        """
+        Initialize Parquet format.
+
+        Args:
+            ctx: Context. ctx["input_path"], if set, names the firewall.
+
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as err:
+            raise ScriptError(
+                "parquet output requires the pyarrow package. "
+                "Install with: pip install netgate-xml-to-xlsx[parquet]"
+            ) from err
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+
+        self.ctx = ctx
+        input_path = ctx.get("input_path")
+        self.firewall = None if input_path is None else Path(input_path).name
+        self.output_dir = Path(ctx["output_path"])
+        self.tables: set[str] = set()
+        self.sheet_data = SheetData()
+
+        self.logger = logging.getLogger()
+        self.header_row_length = 0
+        self.logged_row_length_warning = False
+
+    def start(self) -> None:
+        """Create the output directory, removing sheets of any previous report."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.output_dir.glob("*.parquet"):
+            path.unlink()
+
+    def out(self, sheet_data: SheetData) -> None:
+        """Write the sheet to its own Parquet file."""
+        if not len(sheet_data.data_rows):
+            # Nothing to write
+            return
+
+        self.logged_row_length_warning = False
+        self.header_row_length = len(sheet_data.header_row)
+        self.sheet_data = sheet_data
+
+        used: set[str] = set()
+        names = [identifier(str(x), used) for x in sheet_data.header_row]
+
+        # Buffer column-wise rather than as a list of rows.
+        columns: list[list[str]] = [[] for _ in names]
+        row_count = 0
+        for row_count, row in enumerate(sheet_data.data_rows, start=1):
+            self.check_row_length(row)
+            for column, value in zip(columns, row):
+                column.append(str(value))
+            # Pad short rows.
+            width = len(row)
+            for column in columns[width:]:
+                column.append("")
+
+        arrays = {}
+        if self.firewall is not None and FIREWALL_COLUMN not in names:
+            arrays[FIREWALL_COLUMN] = [self.firewall] * row_count
+        arrays.update(zip(names, columns))
+
+        table = self.pa.table(
+            {name: self._array(name, values) for name, values in arrays.items()}
+        )
+        output_path = self.output_dir / (
+            f"{identifier(sheet_data.sheet_name, self.tables)}.parquet"
+        )
+        self.pq.write_table(table, output_path)
+
+    def finish(self) -> None:
+        """Each sheet is written as it is output."""
+        pass
+
+    def _array(self, name: str, values: list[str]) -> "pa.Array":
+        """Convert a column to an Arrow array, dictionary encoding repetitive columns."""
+        array = self.pa.array(values, type=self.pa.string())
+        if name in DICTIONARY_COLUMNS:
+            return array.dictionary_encode()
+        return array
@@ -0,0 +1,136 @@
+"""SQLite Format"""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+from .base_format import BaseFormat
+
+# Column identifying the firewall each row came from.
+FIREWALL_COLUMN = "firewall"
+
+# Columns indexed when present.
+INDEX_COLUMNS = (FIREWALL_COLUMN, "tracker", "refid", "uuid", "name", "interface")
+
+
+def identifier(name: str, used: set[str]) -> str:
+    """
+    Convert a sheet or header name to a unique SQL identifier.
+
+    Names are lower case with runs of other characters replaced by "_".
+    SQLite identifiers are case insensitive, so duplicates are numbered.
+
+    Args:
+        name: Sheet or header name.
+
+        used: Identifiers already in use. Updated in place.
+
+    Returns:
+        Identifier.
+
+    """
+    base = re.sub(r"\W+", "_", name).strip("_").lower() or "column"
+    if base[0].isdigit():
+        base = f"_{base}"
+    result = base
+    count = 2
+    while result in used:
+        result = f"{base}_{count}"
+        count += 1
+    used.add(result)
+    return result
+
+
+class SqliteFormat(BaseFormat):
+    """
+    SQLite database format.
+
+    Each sheet is written to a table with one row per data row.
+    Unless the sheet already has one, a leading firewall column
+    holds the input filename so databases can be combined and queried together.
+    All rows are inserted in a single transaction and
+    common key columns are indexed once the rows are written.
+    """
+
+    def __init__(self, ctx: dict) -> None:
+        """
+        Initialize SQLite format.
+
+        Args:
+            ctx: Context. ctx["input_path"], if set, names the firewall.
+
+        """
+        self.ctx = ctx
+        input_path = ctx.get("input_path")
+        self.firewall = None if input_path is None else Path(input_path).name
+        self.connection: sqlite3.Connection | None = None
+        self.tables: set[str] = set()
+        self.sheet_data = SheetData()
+
+        self.logger = logging.getLogger()
+        self.header_row_length = 0
+        self.logged_row_length_warning = False
+
+    def start(self) -> None:
+        """Create the database, replacing any previous report."""
+        output_path = Path(self.ctx["output_path"])
+        output_path.unlink(missing_ok=True)
+        self.connection = sqlite3.connect(output_path)
+        # One transaction for the whole report.
+        self.connection.execute("BEGIN")
+
+    def out(self, sheet_data: SheetData) -> None:
+        """Create a table for the sheet and insert its rows."""
+        if not len(sheet_data.data_rows):
+            # Nothing to write
+            return
+
+        self.logged_row_length_warning = False
+        self.header_row_length = len(sheet_data.header_row)
+        self.sheet_data = sheet_data
+
+        header_row = list(sheet_data.header_row)
+        add_firewall = self.firewall is not None and FIREWALL_COLUMN not in header_row
+        if add_firewall:
+            header_row.insert(0, FIREWALL_COLUMN)
+
+        table = identifier(sheet_data.sheet_name, self.tables)
+        used: set[str] = set()
+        columns = [identifier(str(x), used) for x in header_row]
+        column_list = ", ".join(f'"{x}"' for x in columns)
+        placeholders = ", ".join("?" * len(columns))
+
+        connection = self.connection
+        assert connection is not None, "start() not called."
+        connection.execute(f'CREATE TABLE "{table}" ({column_list})')
+        connection.executemany(
+            f'INSERT INTO "{table}" VALUES ({placeholders})',  # nosec
+            self._rows(sheet_data, add_firewall),
+        )
+        for column in columns:
+            if column in INDEX_COLUMNS:
+                connection.execute(
+                    f'CREATE INDEX "{table}_{column}" ON "{table}" ("{column}")'
+                )
+
+    def finish(self) -> None:
+        """Commit and close the database."""
+        connection = self.connection
+        assert connection is not None, "start() not called."
+        connection.commit()
+        connection.close()
+
+    def _rows(self, sheet_data: SheetData, add_firewall: bool) -> Iterator[list]:
+        """Yield rows fitted to the header length."""
+        for row in sheet_data.data_rows:
+            self.check_row_length(row)
+            row = list(row[: self.header_row_length])
+            row.extend([""] * (self.header_row_length - len(row)))
+            if add_firewall:
+                row.insert(0, self.firewall)
+            yield row
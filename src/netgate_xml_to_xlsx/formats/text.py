@@ -2,12 +2,53 @@
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
 import datetime
+import gzip
+import io
 import logging
+from pathlib import Path
+from typing import TextIO
 
+from netgate_xml_to_xlsx.errors import ScriptError
 from netgate_xml_to_xlsx.sheetdata import SheetData
 
 from .base_format import BaseFormat
 
+# Write buffer size for uncompressed output.
+BUFFER_SIZE = 1024 * 1024
+
+
+def open_text(output_path: Path | str, compress: str | None) -> TextIO:
+    """
+    Open a text file for writing, optionally compressed.
+
+    Args:
+        output_path: File to create.
+
+        compress: None, "gzip" or "zstd".
+            zstd requires the optional zstandard package.
+
+    Returns:
+        Text file handle.
+
+    """
+    match compress:
+        case None:
+            return open(output_path, "w", encoding="utf-8", buffering=BUFFER_SIZE)
+        case "gzip":
+            return gzip.open(output_path, "wt", encoding="utf-8")
+        case "zstd":
+            try:
+                import zstandard
+            except ImportError as err:
+                raise ScriptError(
+                    "zstd compression requires the zstandard package. "
+                    "Install with: pip install netgate-xml-to-xlsx[zstd]"
+                ) from err
+            writer = zstandard.ZstdCompressor().stream_writer(open(output_path, "wb"))
+            return io.TextIOWrapper(writer, encoding="utf-8")
+        case _:
+            raise ScriptError(f"Unknown compression: {compress}.")
+
 
 class TextFormat(BaseFormat):
     """
@@ -16,20 +57,25 @@ class TextFormat(BaseFormat):
     Allows convenience "diffing" between versions.
     Each line starts with the display name.
     All elements are flattened (\n removed) and separated by tab.
+
+    Rows are written to a large buffer with one write per row.
+    The buffer is flushed after each section, or every ctx["flush_rows"] rows if set.
+    ctx["compress"] optionally compresses the output (gzip or zstd).
     """
 
     def __init__(self, ctx: dict) -> None:
         self.ctx = ctx
-        self.output_fh = 0
+        self.output_fh: TextIO | None = None
+        self.flush_rows: int = ctx.get("flush_rows") or 0
         self.sheet_data = SheetData()
 
         self.logger = logging.getLogger()
         self.header_row_length = 0
         self.logged_row_length_warning = False
 
-    def start(self):
+    def start(self) -> None:
         """Create output file."""
-        self.output_fh = open(self.ctx["output_path"], "w", encoding="utf-8")
+        self.output_fh = open_text(self.ctx["output_path"], self.ctx.get("compress"))
 
     def out(self, sheet_data: SheetData) -> None:
         """
@@ -46,29 +92,38 @@ class TextFormat(BaseFormat):
         self.logged_row_length_warning = False
         self.header_row_length = len(sheet_data.header_row)
         self.sheet_data = sheet_data
-        for row in sheet_data.data_rows:
+
+        fh = self.output_fh
+        assert fh is not None, "start() not called."
+        for row_num, row in enumerate(sheet_data.data_rows, start=1):
             self.check_row_length(row)
-            self._write_row(row)
-            self.output_fh.write(row_separator)
+            fh.write(self._format_row(row) + row_separator)
+            if self.flush_rows and not row_num % self.flush_rows:
+                fh.flush()
 
-        self.output_fh.write(section_separator)
+        fh.write(section_separator)
+        fh.flush()
 
     def finish(self) -> None:
         """Write trailer and save file."""
+        fh = self.output_fh
+        assert fh is not None, "start() not called."
         now = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M")
-        self.output_fh.write(f"Runtime: {now}.\n")
-        self.output_fh.close()
+        fh.write(f"Runtime: {now}.\n")
+        fh.close()
 
-    def _write_row(self, row: list[str]) -> None:
+    def _format_row(self, row: list[str]) -> str:
         """
-        Write one data row's information.
+        Format one data row's information.
 
-        Write each element on a single line in format:
+        Each element is on a single line in format:
             sheet_name: header: value (flattened into a single line)
         """
         # Flatten the data.
         data = [x.replace("\n", "; ") for x in row]
 
-        for node, value in zip(self.sheet_data.header_row, data):
-            self.output_fh.write(f"{self.sheet_data.sheet_name}: {node}: {value}\n")
-        self.output_fh.flush()
+        sheet_name = self.sheet_data.sheet_name
+        return "".join(
+            f"{sheet_name}: {node}: {value}\n"
+            for node, value in zip(self.sheet_data.header_row, data)
+        )
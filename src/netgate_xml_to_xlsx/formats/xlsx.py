@@ -3,8 +3,10 @@
 
 import datetime
 import logging
+from typing import Any
 
 from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.styles import Border, Font, NamedStyle, PatternFill, Side
 from openpyxl.styles.alignment import Alignment
 from openpyxl.utils import get_column_letter
@@ -17,8 +19,18 @@ from .base_format import BaseFormat
 
 class XlsxFormat(BaseFormat):
     def __init__(self, ctx: dict) -> None:
+        """
+        Initialize XLSX format.
+
+        Args:
+            ctx: Context. If ctx["stream"] is True use a write-only workbook
+                which writes each sheet to disk as it is output
+                instead of holding the whole workbook in memory.
+
+        """
         self.ctx = ctx
-        self.workbook = Workbook()
+        self.write_only = bool(ctx.get("stream"))
+        self.workbook = Workbook(write_only=self.write_only)
         self._init_styles()
         self.default_alignment = Alignment(wrap_text=True, vertical="top")
         self.sheet = None
@@ -38,6 +50,10 @@ class XlsxFormat(BaseFormat):
             sheet_data = self.rotate_rows(sheet_data)
 
         self.sheet = self.workbook.create_sheet(sheet_data.sheet_name)
+        if self.write_only:
+            self._out_write_only(self.sheet, sheet_data)
+            return
+
         self._sheet_header(self.sheet, sheet_data)
 
         # Define starting row num in case there are no rows to display.
@@ -49,10 +65,39 @@ class XlsxFormat(BaseFormat):
 
     def finish(self) -> None:
         """Delete empty first sheet and then save Workbook."""
-        sheets = self.workbook.sheetnames
-        del self.workbook[sheets[0]]
+        if not self.write_only:
+            # Write-only workbooks do not have an initial sheet.
+            sheets = self.workbook.sheetnames
+            del self.workbook[sheets[0]]
         self.workbook.save(self.ctx["output_path"])
 
+    def _out_write_only(self, sheet: Any, sheet_data: SheetData) -> None:
+        """
+        Append the sheet's rows to a write-only worksheet.
+
+        openpyxl's write-only worksheet class is private, hence sheet: Any.
+        Column widths must be set before the first row is appended.
+        """
+        for column_number, width in enumerate(sheet_data.column_widths, start=1):
+            column_letter = get_column_letter(column_number)
+            sheet.column_dimensions[column_letter].width = width
+
+        sheet.append(self._styled_cells(sheet, sheet_data.header_row, "header"))
+        for row in sheet_data.data_rows:
+            sheet.append(self._styled_cells(sheet, row, "normal"))
+
+        now = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M")
+        sheet.append(self._styled_cells(sheet, [f"Run date: {now}"], "footer"))
+
+    def _styled_cells(self, sheet: Any, row: list, style_name: str) -> list[Cell]:
+        """Create a row of write-only cells with a named style."""
+        cells = []
+        for value in row:
+            cell = WriteOnlyCell(sheet, value)
+            cell.style = style_name
+            cells.append(cell)
+        return cells
+
     def _init_styles(self) -> None:
         """Iniitalized worksheet styles."""
         xlsx_header_font = Font(name="Calibri", size=16, italic=True, bold=True)
@@ -122,10 +167,8 @@ class XlsxFormat(BaseFormat):
 
         """
         for column_number, value in enumerate(row, start=1):
-            column_letter = get_column_letter(column_number)
-            coordinate = f"{column_letter}{row_num}"
-            sheet[coordinate] = value
-            sheet[coordinate].style = style_name
+            cell = sheet.cell(row=row_num, column=column_number, value=value)
+            cell.style = style_name
 
     def _sheet_footer(self, sheet: Worksheet, row_number: int) -> None:
         """Write footer information on each sheet."""
@@ -0,0 +1,58 @@
+"""Load configuration files into an XML tree."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from pathlib import Path
+
+from lxml import etree  # nosec
+
+from netgate_xml_to_xlsx.mytypes import Node
+
+from .errors import ScriptError
+
+# lxml parser options that may be set in the [parser] table of plugins.toml.
+#   huge_tree: Allow very deep trees and very large text nodes.
+#   remove_blank_text: Discard whitespace-only text.
+#       Some plugins rely on that whitespace, so leave this off.
+#   collect_ids: Build a lookup of xml:id attributes. pfSense does not use them.
+PARSER_DEFAULTS = {
+    "huge_tree": False,
+    "remove_blank_text": False,
+    "collect_ids": False,
+}
+
+
+def parser_options(config: dict) -> dict[str, bool]:
+    """
+    Merge the [parser] table of the configuration with the defaults.
+
+    Args:
+        config: Configuration loaded from plugins.toml.
+
+    Returns:
+        Keyword arguments for etree.XMLParser and etree.iterparse.
+
+    """
+    options = config.get("parser", {})
+    if unknown := [x for x in options if x not in PARSER_DEFAULTS]:
+        raise ScriptError(f"""Unknown [parser] option(s): {",".join(unknown)}.""")
+    return PARSER_DEFAULTS | {k: bool(v) for k, v in options.items()}
+
+
+def load_xml(input_path: Path, options: dict[str, bool] | None = None) -> Node:
+    """
+    Parse an XML file.
+
+    libxml2 reads and decodes the file itself, in chunks,
+    so neither the raw bytes nor a decoded str copy of the file is held in memory.
+
+    Args:
+        input_path: XML file to parse.
+
+        options: Parser options. Default: PARSER_DEFAULTS.
+
+    Returns:
+        Root node.
+
+    """
+    parser = etree.XMLParser(**(options or PARSER_DEFAULTS))
+    return etree.parse(str(input_path), parser).getroot()
@@ -1,24 +1,46 @@
 """Main netgate converstion module."""
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
+import argparse
+import datetime
+import logging
 import sys
 from importlib.metadata import version
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import toml
-
-from .errors import NodeError
+from .errors import ScriptError
 from .logging import create_logger
 from .parse_args import parse_args
-from .pfsense import PfSense
+
+if TYPE_CHECKING:
+    from .pfsense import PfSense
 
 LOGGER = None
 
 
-def banner(pfsense: PfSense) -> None:
+def banner(pfsense: "PfSense") -> None:
     """Tell people what we're doing."""
     script = "netgate-xml-to-xlsx"
     package = script.replace("-", "_")
-    LOGGER.info(f"{script} version {version(package)}.")
+    logging.getLogger().info(f"{script} version {version(package)}.")
+
+
+def _diff(args: argparse.Namespace) -> None:
+    """Compare two configuration files."""
+    global LOGGER
+
+    import toml
+
+    from .diff import ConfigDiff
+
+    LOGGER = logger = create_logger(args)
+    config = toml.load("./plugins.toml")
+    config["args"] = args
+
+    logger.info(f"Comparing: {args.old_file} to {args.new_file}.")
+    ConfigDiff(config, args.old_file, args.new_file).write(config["plugins"])
+    logger.info("Done.")
 
 
 def _main() -> None:
@@ -26,6 +48,13 @@ def _main() -> None:
     global LOGGER
 
     args = parse_args()
+    if args.command == "diff":
+        _diff(args)
+        return
+
+    # Deferred so --version and --help do not load lxml, openpyxl or the plugins.
+    import toml
+
     LOGGER = logger = create_logger(args)
     in_files = args.in_files
     config = toml.load("./plugins.toml")
@@ -34,28 +63,53 @@ def _main() -> None:
     if args.sanitize:
         logger.info("Sanitizing files.")
     else:
-        LOGGER.info(f"Output format: {args.output_format}.")
+        logger.info(f"""Output format: {", ".join(args.output_format)}.""")
 
-    for in_filename in in_files:
-        logger.info(f"Processing: {in_filename}")
-        pfsense = PfSense(config, in_filename)
+    if args.profile:
+        from .profiler import profiled
 
-        if args.sanitize:
-            pfsense.sanitize(config["plugins"])
-            continue
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        profile_path = Path(args.log_dir) / f"profile-{timestamp}"
+        logger.info(f"Profile path: {profile_path}.pstats, {profile_path}.collapsed.")
+        with profiled(profile_path):
+            _convert(config, in_files)
+    else:
+        _convert(config, in_files)
 
-        LOGGER.info(f"Output path: {pfsense.output_path}.")
+    logger.info("Done.")
 
-        pfsense.run_all_plugins(config["plugins"])
 
-    logger.info("Done.")
+def _convert(config: dict, in_files: list[Path]) -> None:
+    """Convert or sanitize the input files."""
+    from .batch import process_file, run_batch
+
+    args = config["args"]
+    logger = logging.getLogger()
+
+    if args.fleet:
+        from .fleet import run_fleet
+
+        run_fleet(config, in_files)
+    elif args.jobs != 1 and len(in_files) > 1:
+        results = run_batch(config, in_files, args.jobs)
+        failed = [x.in_filename for x in results if not x.ok]
+        logger.info(
+            f"Processed {len(results)} files: "
+            f"{len(results) - len(failed)} succeeded, {len(failed)} failed."
+        )
+        if failed:
+            logger.error(f"""Failed: {", ".join(str(x) for x in failed)}.""")
+            sys.exit(-1)
+    else:
+        for in_filename in in_files:
+            process_file(config, in_filename)
 
 
 def main() -> None:
     """Drive and catch exceptions."""
     try:
         _main()
-    except NodeError as err:
+    except ScriptError as err:
         if LOGGER is None:
             print(err)
         else:
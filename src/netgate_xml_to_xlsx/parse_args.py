@@ -6,6 +6,11 @@ import sys
 from importlib.metadata import version
 from pathlib import Path
 
+from .formats import COMPRESSION, DIFF_FORMATS, FORMATS, TEXT_FORMATS
+
+# Subcommands. Arguments not starting with one are for convert.
+COMMANDS = ("convert", "diff")
+
 
 def filter_infiles(in_files: list[str], include: bool = True) -> list[Path]:
     """Return list of Paths that are files and include or exclude 'sanitized'."""
@@ -15,13 +20,34 @@ def filter_infiles(in_files: list[str], include: bool = True) -> list[Path]:
     return [x for x in files if "sanitized" not in x.name and x.is_file()]
 
 
-def parse_args() -> argparse.Namespace:
+def format_list(value: str) -> list[str]:
     """
-    Parse command line arguments.
+    Convert a comma separated list of output formats to a list.
+
+    Args:
+        value: Output formats, e.g. "txt,xlsx".
+
+    Returns:
+        Output formats without duplicates, in order.
 
-    Process in_files and out_dir.
     """
-    parser = argparse.ArgumentParser("Netgate XML to XLSX")
+    output_formats = list(dict.fromkeys(x.strip() for x in value.split(",")))
+    if unknown := [x for x in output_formats if x not in FORMATS]:
+        raise argparse.ArgumentTypeError(
+            f"""unknown format(s): {", ".join(unknown)} """
+            f"""(choose from {", ".join(FORMATS)})"""
+        )
+    return output_formats
+
+
+def name_list(value: str) -> list[str]:
+    """Convert a comma separated list of names to a list without duplicates."""
+    return list(dict.fromkeys(x.strip() for x in value.split(",") if x.strip()))
+
+
+def common_parser() -> argparse.ArgumentParser:
+    """Return a parser of the options shared by all commands."""
+    parser = argparse.ArgumentParser(add_help=False)
     default = "./output"
     parser.add_argument(
         "--output-dir",
@@ -30,18 +56,74 @@ def parse_args() -> argparse.Namespace:
         default=default,
         help=f"Output directory. Default: {default}",
     )
-    parser.add_argument(
-        "in_files", nargs="+", help="One or more Netgate .xml files to process."
-    )
 
-    choices = ["xlsx", "txt"]
+    choices = list(FORMATS)
     default = "txt"
     parser.add_argument(
         "--output-format",
         "-F",
         default=default,
+        type=format_list,
+        help=(
+            f"""Output format(s), comma separated: {", ".join(choices)}. """
+            "Several formats are written from a single pass, e.g. txt,xlsx. "
+            f"Default: {default}."
+        ),
+    )
+
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Additional logging."
+    )
+
+    parser.add_argument("--debug", action="store_true", help="Debug logging.")
+
+    default = "./logs"
+    parser.add_argument(
+        "--log-dir",
+        type=str,
+        default=default,
+        help=f"Log directory. Default: {default}.",
+    )
+    return parser
+
+
+def add_convert_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the convert command's arguments to parser."""
+    parser.add_argument(
+        "in_files", nargs="+", help="One or more Netgate .xml files to process."
+    )
+
+    parser.add_argument(
+        "--writer-threads",
+        action="store_true",
+        help="With several output formats, write each format on its own thread.",
+    )
+
+    choices = list(COMPRESSION)
+    parser.add_argument(
+        "--compress",
         choices=choices,
-        help=f"""Output format: {", ".join(choices)}. Default: {default}.""",
+        help=(
+            f"""Compress txt or jsonl output: {", ".join(choices)}. """
+            "zstd requires the zstandard package. Default: no compression."
+        ),
+    )
+
+    default = 0
+    parser.add_argument(
+        "--flush-rows",
+        type=int,
+        default=default,
+        help=(
+            "Flush txt and jsonl output every N rows. "
+            f"0 flushes once per section. Default: {default}."
+        ),
+    )
+
+    parser.add_argument(
+        "--stdout",
+        action="store_true",
+        help="Write jsonl output to standard output instead of the output directory.",
     )
 
     parser.add_argument(
@@ -51,19 +133,124 @@ def parse_args() -> argparse.Namespace:
     )
 
     parser.add_argument(
-        "-v", "--verbose", action="store_true", help="Additional logging."
+        "--stream",
+        action="store_true",
+        help=(
+            "Parse input one top-level section at a time to limit memory use "
+            "on very large files."
+        ),
     )
 
-    parser.add_argument("--debug", action="store_true", help="Debug logging.")
+    default = 1
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=default,
+        help=(
+            "Number of input files to process in parallel. "
+            f"0 uses all CPUs. Default: {default}."
+        ),
+    )
 
-    default = "./logs"
+    default = 1
     parser.add_argument(
-        "--log-dir",
-        type=str,
+        "--plugin-workers",
+        type=int,
         default=default,
-        help=f"Log directory. Default: {default}.",
+        help=(
+            "Number of plugins to run in parallel for each file. "
+            f"0 uses all CPUs. Default: {default}."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help=(
+            "Cache reports in this directory and reuse them for unchanged input files. "
+            "Default: no cache."
+        ),
+    )
+
+    default = 1024
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=default,
+        help=f"Maximum cache size in MB. Default: {default}.",
     )
 
+    parser.add_argument(
+        "--fleet",
+        metavar="NAME",
+        help=(
+            "Combine all input files into a single NAME.FLEET report, "
+            "one sheet per sheet type with a leading firewall column. "
+            "Files are converted one at a time without caching. Default: one report per file."
+        ),
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help=(
+            "Log the time, CPU time, peak memory and rows of each plugin, slowest first. "
+            "Memory tracing slows processing."
+        ),
+    )
+
+    parser.add_argument(
+        "--stats-json",
+        action="store_true",
+        help="Write plugin statistics to <filename>.STATS.json in the output directory.",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Profile the run with cProfile. Writes profile-<timestamp>.pstats "
+            "and .collapsed (flame graph stacks) to the log directory. "
+            "Only the main thread is profiled."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile-plugins",
+        metavar="NAMES",
+        type=name_list,
+        default=[],
+        help=(
+            "Profile only the named plugins (comma separated). "
+            "Writes <filename>.<plugin>.pstats and .collapsed to the log directory. "
+            "Plugins run one at a time, as if --plugin-workers 1."
+        ),
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    convert is the default command, so `netgate-xml-to-xlsx fw-sanitized.xml`
+    converts the file. Process in_files and out_dir.
+
+    Args:
+        argv: Arguments. Default: sys.argv[1:].
+
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in (*COMMANDS, "-h", "--help", "--version"):
+        argv = ["convert", *argv]
+
+    parser = argparse.ArgumentParser(
+        "Netgate XML to XLSX",
+        epilog=(
+            "convert is the default command: netgate-xml-to-xlsx [options] in_files. "
+            "Name it to convert a file named diff or convert."
+        ),
+    )
     __version__ = version("netgate_xml_to_xlsx")
     parser.add_argument(
         "--version",
@@ -72,8 +259,45 @@ def parse_args() -> argparse.Namespace:
         help="Show version number.",
     )
 
-    args = parser.parse_args()
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+    common = common_parser()
+    add_convert_arguments(
+        commands.add_parser(
+            "convert",
+            parents=[common],
+            help="Convert or sanitize configuration files (default).",
+        )
+    )
+    add_diff_arguments(
+        commands.add_parser(
+            "diff",
+            parents=[common],
+            help="Report the differences between two configurations.",
+            description=(
+                "Report added, removed and changed fields between two configurations."
+            ),
+        )
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "diff":
+        check_diff_args(args)
+    else:
+        check_convert_args(args)
+
+    # Convert output-dir to path and optionally create path.
+    out_dir = Path(args.output_dir)
+    try:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        args.output_dir = out_dir
+    except OSError as err:
+        print(f"Error: {err}")
+        sys.exit(-1)
+    return args
+
 
+def check_convert_args(args: argparse.Namespace) -> None:
+    """Filter the convert command's input files and check its options."""
     # Filter files in/out.
     if args.sanitize:
         args.in_files = filter_infiles(args.in_files, include=False)
@@ -89,12 +313,87 @@ def parse_args() -> argparse.Namespace:
         print(msg)
         sys.exit(-1)
 
-    # Convert output-dir to path and optionally create path.
-    out_dir = Path(args.output_dir)
-    try:
-        out_dir.mkdir(parents=True, exist_ok=True)
-        args.output_dir = out_dir
-    except OSError as err:
-        print(f"Error: {err}")
+    if args.jobs < 0:
+        print("Error: --jobs must be 0 or greater.")
+        sys.exit(-1)
+
+    if args.plugin_workers < 0:
+        print("Error: --plugin-workers must be 0 or greater.")
+        sys.exit(-1)
+
+    if args.flush_rows < 0:
+        print("Error: --flush-rows must be 0 or greater.")
+        sys.exit(-1)
+
+    if args.cache_size < 0:
+        print("Error: --cache-size must be 0 or greater.")
+        sys.exit(-1)
+
+    if (args.stats or args.stats_json) and args.sanitize:
+        print("Error: --stats and --stats-json cannot be used with --sanitize.")
+        sys.exit(-1)
+
+    if args.fleet and args.sanitize:
+        print("Error: --fleet cannot be used with --sanitize.")
+        sys.exit(-1)
+
+    if args.fleet and (args.jobs != 1 or args.cache_dir):
+        print("Error: --fleet cannot be used with --jobs or --cache-dir.")
+        sys.exit(-1)
+
+    if args.cache_dir and "parquet" in args.output_format:
+        print("Error: --cache-dir does not support parquet output.")
+        sys.exit(-1)
+
+    if args.compress and not set(args.output_format) & set(TEXT_FORMATS):
+        print("Error: --compress requires txt or jsonl output format.")
+        sys.exit(-1)
+
+    if args.stdout:
+        if args.output_format != ["jsonl"] or args.compress:
+            print("Error: --stdout requires uncompressed jsonl output format.")
+            sys.exit(-1)
+        if args.cache_dir or (args.jobs != 1 and len(args.in_files) > 1):
+            print("Error: --stdout cannot be used with --cache-dir or --jobs.")
+            sys.exit(-1)
+
+    if args.profile_plugins:
+        # Deferred so other command lines do not load lxml.
+        from .plugin_tools import discover_plugins
+
+        plugins = discover_plugins()
+        if unknown := [x for x in args.profile_plugins if x not in plugins]:
+            print(
+                f"""Error: unknown --profile-plugins plugin(s): {", ".join(unknown)}."""
+            )
+            sys.exit(-1)
+
+    if args.profile:
+        if args.profile_plugins:
+            print("Error: --profile cannot be used with --profile-plugins.")
+            sys.exit(-1)
+        if args.jobs != 1 and len(args.in_files) > 1:
+            print("Error: --profile cannot be used with --jobs. Use --profile-plugins.")
+            sys.exit(-1)
+
+
+def add_diff_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the diff command's arguments to parser."""
+    parser.add_argument("old_file", type=Path, help="Original sanitized .xml file.")
+    parser.add_argument("new_file", type=Path, help="Changed sanitized .xml file.")
+
+
+def check_diff_args(args: argparse.Namespace) -> None:
+    """Check the diff command's input files and options."""
+    for in_file in (args.old_file, args.new_file):
+        if not filter_infiles([str(in_file)]):
+            print(f"Error: {in_file} is not a sanitized file.")
+            sys.exit(-1)
+
+    if len(args.output_format) != 1:
+        print("Error: diff writes a single output format.")
+        sys.exit(-1)
+    args.output_format = args.output_format[0]
+    if args.output_format not in DIFF_FORMATS:
+        print(f"""Error: diff writes {" or ".join(DIFF_FORMATS)} output.""")
         sys.exit(-1)
-    return args
@@ -1,53 +1,109 @@
 """PfSense class."""
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
+import argparse
+import cProfile
 import logging
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import cast
+from typing import Generator, Iterable, Iterator, cast
 
 from lxml import etree  # nosec
 
 from netgate_xml_to_xlsx.mytypes import Node
 
-from .formats import TextFormat, XlsxFormat
-from .plugin_tools import discover_plugins
-from .plugins.support.elements import sanitize_xml
+from .cache import ResultCache, update_section_hashes
+from .formats import COMPRESSION, TEXT_FORMATS, create_format
+from .formats.base_format import BaseFormat
+from .loader import load_xml, parser_options
+from .plugin_tools import (
+    discover_plugins,
+    index_nodes,
+    index_section,
+    plugin_sections,
+    plugins_to_run,
+)
+from .plugins.support.elements import compile_selector, sanitize_xml
+from .profiler import profile_sheets, write_profile
+from .sheetdata import SheetData
+from .stats import Stats
+from .streaming import iter_sections, sanitize_stream
+
+
+def report_path(args: argparse.Namespace, input_path: Path, output_format: str) -> Path:
+    """Generate the report path for an input file and output format."""
+    suffix = COMPRESSION.get(args.compress, "") if output_format in TEXT_FORMATS else ""
+    return cast(Path, args.output_dir) / Path(
+        f"{input_path.name}.REPORT.{output_format}{suffix}"
+    )
+
+
+def report_paths(args: argparse.Namespace, input_path: Path) -> dict[str, Path]:
+    """Generate output format: report path for each requested output format."""
+    return {x: report_path(args, input_path, x) for x in args.output_format}
 
 
 class PfSense:
     """Handle all pfSense parsing and conversion."""
 
-    def __init__(self, config: dict, in_filename: str) -> None:
+    def __init__(
+        self, config: dict, in_filename: str | Path, cache: ResultCache | None = None
+    ) -> None:
         """
         Initialize and load XML.
 
         Technically a bit too much work to do in an init (since it can fail).
+
+        Args:
+            config: Configuration loaded from plugins.toml, including parsed arguments.
+
+            in_filename: Input file.
+
+            cache: Optional cache of plugin sheets.
+
         """
         self.config = config
         self.args = config["args"]
         self.input_path = (input_path := Path(in_filename))
         self.raw_xml: str = ""
         self.parsed_xml: Node = None
+        self.node_index: set[str] = set()
+        self.parser_options = parser_options(config)
 
-        self.output_path = self._get_output_path(input_path)
+        self.output_paths = self._get_output_paths(input_path)
 
         self.plugins = discover_plugins()
-        self.output_format = None
+        self.output_format: BaseFormat | None = None
+        self.executor: ThreadPoolExecutor | None = None
+        self.cache = cache
+        # Tag: sha256 of top-level sections. Only maintained when caching.
+        self.section_hashes: dict = {}
+        # Created while the plugins run so memory tracing only covers the plugins.
+        self.stats: Stats | None = None
+        self.profiles = {x: cProfile.Profile() for x in self.args.profile_plugins}
         self.logger = logging.getLogger()
 
+        if self.args.sanitize or self.args.stream:
+            # Sanitize parses the sanitized text.
+            # Stream parses incrementally when the plugins are run.
+            return
         self._load()
 
-    def _get_output_path(self, input_path: Path) -> Path:
-        """Generate output path based on args and in_filename."""
-        self.output_path = cast(Path, self.args.output_dir) / Path(
-            f"{input_path.name}.REPORT.{self.args.output_format}"
-        )
+    def _get_output_paths(self, input_path: Path) -> dict[str, Path]:
+        """Generate output paths based on args and in_filename."""
+        self.output_paths = report_paths(self.args, input_path)
+        return self.output_paths
 
-        return self.output_path
+    def _sanity_check_root_node(self, tags: list[str]) -> None:
+        """
+        Check for unknown root elements.
 
-    def _sanity_check_root_node(self) -> None:
-        """Check for unknown root elements."""
+        Args:
+            tags: Tags of the root node's children.
+
+        """
         expected_nodes = set(
             (
                 "version,lastchange,revision,aliases,ca,"
@@ -63,9 +119,9 @@ class PfSense:
             ).split(",")
         )
         unknown = []
-        for child in self.parsed_xml:
-            if child.tag not in expected_nodes:
-                unknown.append(child.tag)
+        for tag in tags:
+            if tag not in expected_nodes:
+                unknown.append(tag)
         if len(unknown):
             self.logger.warning(f"""Unknown root node(s): {",".join(unknown)}""")
 
@@ -74,11 +130,14 @@ class PfSense:
 
         Return pfsense keys.
         """
-        self.raw_xml = self.input_path.read_text(encoding="utf-8")
-        self.parsed_xml = etree.XML(self.raw_xml)
-        self._sanity_check_root_node()
+        self.parsed_xml = load_xml(self.input_path, self.parser_options)
+        self.node_index = index_nodes(self.parsed_xml)
+        if self.cache is not None:
+            for section in self.parsed_xml.iterchildren(etree.Element):
+                update_section_hashes(self.section_hashes, section)
+        self._sanity_check_root_node([x.tag for x in self.parsed_xml])
 
-    def sanitize(self, plugins_to_run) -> None:
+    def sanitize(self, plugin_names: list[str]) -> None:
         """
         Sanitize the raw XML and save as original filename + '-sanitized'.
 
@@ -87,17 +146,53 @@ class PfSense:
         Parse the XML into a tree and call the individual plugin sanitizers.
         Call the individual plugin sanitizers.
 
+        With --stream, both steps are applied in one incremental pass instead.
+
         Args:
-            plugins_to_run: List of active plugin names.
+            plugin_names: List of active plugin names.
 
         """
+        parts = os.path.splitext(self.input_path)
+        if len(parts) == 1:
+            out_path = Path(f"{parts[0]}-sanitized")
+        else:
+            out_path = Path(f"{parts[0]}-sanitized{parts[1]}")
+
+        counts: Counter = Counter()
+        if self.args.stream:
+            el_paths = []
+            for plugin_name in plugin_names:
+                el_paths.extend(self.plugins[plugin_name].el_paths_to_sanitize or [])
+            root_tags = sanitize_stream(
+                self.input_path, out_path, el_paths, self.parser_options, counts
+            )
+            self._sanity_check_root_node(root_tags)
+        else:
+            self._sanitize_tree(plugin_names, out_path, counts)
+
+        for tag, count in sorted(counts.items()):
+            self.logger.verbose(f"Sanitized {count} <{tag}> element(s).")
+        self.logger.info(f"Sanitized file written: {out_path}.")
+
+        # Delete the unsanitized file.
+        self.input_path.unlink()
+        self.logger.info(f"Deleted original file: {self.input_path}.")
+
+    def _sanitize_tree(
+        self, plugin_names: list[str], out_path: Path, counts: Counter
+    ) -> None:
+        """Sanitize the raw XML, then the parsed XML, and save."""
         # Run generic sanitize.
-        self.raw_xml = sanitize_xml(self.raw_xml)
+        self.raw_xml = sanitize_xml(self.input_path.read_text(encoding="utf-8"), counts)
 
         # Parse xml for plugin sanitizing.
-        self.parsed_xml = etree.XML(self.raw_xml)
+        self.parsed_xml = etree.XML(
+            self.raw_xml, etree.XMLParser(**self.parser_options)
+        )
+        self.node_index = index_nodes(self.parsed_xml)
+        self._sanity_check_root_node([x.tag for x in self.parsed_xml])
 
-        for plugin_name in plugins_to_run:
+        for plugin_name in self._active_plugins(plugin_names):
             plugin = self.plugins[plugin_name]
             plugin.sanitize(self.parsed_xml)
 
@@ -105,38 +200,267 @@ class PfSense:
         self.raw_xml = etree.tostring(self.parsed_xml, pretty_print=True).decode("utf8")
 
         # Save sanitized XML
-        parts = os.path.splitext(self.input_path)
-        if len(parts) == 1:
-            out_path = Path(f"{parts[0]}-sanitized")
-        else:
-            out_path = Path(f"{parts[0]}-sanitized{parts[1]}")
         out_path.write_text(f"{self.raw_xml}", encoding="utf-8")
-        self.logger.info(f"Sanitized file written: {out_path}.")
 
-        # Delete the unsanitized file.
-        self.input_path.unlink()
-        self.logger.info(f"Deleted original file: {self.input_path}.")
+    def _active_plugins(self, plugin_names: list[str]) -> list[str]:
+        """Return the plugins whose nodes are present in the document."""
+        active = plugins_to_run(plugin_names, self.node_index)
+        if skipped := [x for x in plugin_names if x not in active]:
+            self.logger.debug(f"""No nodes for plugin(s): {",".join(skipped)}.""")
+        return active
 
     def run_all_plugins(self, plugin_names: list[str]) -> None:
         """Run each plugin in order."""
-        formats = {"txt": TextFormat, "xlsx": XlsxFormat}
-        self.output_format = formats[self.args.output_format](
-            ctx={"input_path": self.input_path, "output_path": self.output_path}
+        self.output_format = output_format = create_format(
+            self.output_paths,
+            ctx={
+                "input_path": self.input_path,
+                "stream": self.args.stream,
+                "compress": self.args.compress,
+                "flush_rows": self.args.flush_rows,
+                "stdout": self.args.stdout,
+            },
+            writer_threads=self.args.writer_threads,
         )
-        self.output_format.start()
+        output_format.start()
+        named_sheets = self._named_sheets(plugin_names)
+        try:
+            for plugin_name, sheet_data in named_sheets:
+                if self.stats is None:
+                    output_format.out(sheet_data)
+                    continue
+                with self.stats.output(plugin_name):
+                    output_format.out(sheet_data)
+        finally:
+            # Stop the plugins (and memory tracing) and close the output files
+            # even if a plugin or the output fails.
+            named_sheets.close()
+            output_format.finish()
+
+    def iter_sheets(self, plugin_names: list[str]) -> Iterator[SheetData]:
+        """
+        Run each plugin and yield its sheets in plugin_names order.
+
+        Args:
+            plugin_names: Plugins to run, in output order.
+
+        """
+        for _, sheet_data in self._named_sheets(plugin_names):
+            yield sheet_data
 
+    def _named_sheets(
+        self, plugin_names: list[str]
+    ) -> Generator[tuple[str, SheetData], None, None]:
+        """
+        Run each plugin and yield (plugin name, sheet) in plugin_names order.
+
+        Statistics, if requested, are collected until the generator finishes or closes.
+        """
+        if self.args.stats or self.args.stats_json:
+            self.stats = Stats()
+        workers = self.args.plugin_workers or os.cpu_count() or 1
+        if self.profiles:
+            # cProfile cannot profile plugins running concurrently.
+            workers = 1
+        if workers > 1:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+
+        try:
+            if self.args.stream:
+                yield from self._run_streaming(plugin_names)
+            else:
+                active = self._active_plugins(plugin_names)
+                for plugin_name, sheets in zip(active, self._plugin_results(active)):
+                    yield from ((plugin_name, x) for x in sheets)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+            if self.stats is not None:
+                self.stats.close()
+
+        self.logger.debug(f"Selector cache: {compile_selector.cache_info()}.")
+
+    def _run_streaming(
+        self, plugin_names: list[str]
+    ) -> Iterator[tuple[str, SheetData]]:
+        """
+        Parse the input incrementally and run plugins as their sections complete.
+
+        A section is complete once a different top-level tag starts
+        (pfSense repeats some top-level tags, such as cert).
+        A plugin runs once all the sections it reads are complete.
+        Sections are removed from the tree once no waiting plugin reads them,
+        so peak memory is bounded by the largest section rather than the whole file.
+
+        Output is buffered as required to keep the configured plugin order.
+
+        Args:
+            plugin_names: Plugins to run, in output order.
+
+        """
+        if unknown := [x for x in plugin_names if plugin_sections(x) is None]:
+            self.logger.warning(
+                f"""Streaming skips plugin(s) with unknown nodes: {",".join(unknown)}."""
+            )
+        plugin_names = [x for x in plugin_names if x not in unknown]
+        sections = {x: cast(set[str], plugin_sections(x)) for x in plugin_names}
+
+        waiting = plugin_names[:]
+        results: dict[str, list[SheetData]] = {}
+        complete: set[str] = set()
+        root_tags: list[str] = []
+        emitted = 0
+
+        def run_ready(done: bool) -> list[tuple[str, SheetData]]:
+            nonlocal emitted
+            ready = [x for x in waiting if done or sections[x] <= complete]
+            for plugin_name in ready:
+                waiting.remove(plugin_name)
+                results[plugin_name] = []
+
+            # All ready plugins finish before parsing resumes.
+            to_run = plugins_to_run(ready, self.node_index)
+            for plugin_name, sheets in zip(to_run, self._plugin_results(to_run)):
+                results[plugin_name] = list(sheets)
+
+            # Output in configured order.
+            output: list[tuple[str, SheetData]] = []
+            while emitted < len(plugin_names) and plugin_names[emitted] in results:
+                plugin_name = plugin_names[emitted]
+                output.extend((plugin_name, x) for x in results.pop(plugin_name))
+                emitted += 1
+            return output
+
+        def drop_unused(root: Node, in_progress: Node | None = None) -> None:
+            needed = set().union(*(sections[x] for x in waiting))
+            for section in list(root.iterchildren(etree.Element)):
+                if section.tag not in needed and section is not in_progress:
+                    section.clear()
+                    root.remove(section)
+
+        current_tag = None
+        for event, root, section in iter_sections(self.input_path, self.parser_options):
+            self.parsed_xml = root
+            if section is None:
+                # "done": the document is completely parsed.
+                self._sanity_check_root_node(root_tags)
+                yield from run_ready(done=True)
+                continue
+            match event:
+                case "start" if section.tag != current_tag:
+                    if current_tag is not None:
+                        complete.add(current_tag)
+                        yield from run_ready(done=False)
+                        drop_unused(root, section)
+                    current_tag = section.tag
+                case "end":
+                    root_tags.append(section.tag)
+                    self.node_index |= index_section(section)
+                    if self.cache is not None:
+                        update_section_hashes(self.section_hashes, section)
+                    drop_unused(root, None)
+
+    def _plugin_results(self, plugin_names: list[str]) -> Iterator[Iterable[SheetData]]:
+        """
+        Run plugins and yield each plugin's sheets in plugin_names order.
+
+        With --plugin-workers, plugins run concurrently in a thread pool.
+        Plugins only read the parsed XML, so they can share it.
+        Each plugin's sheets are yielded once it and all plugins before it
+        have finished, so output order does not depend on completion order.
+
+        Args:
+            plugin_names: Plugins to run, in output order.
+
+        """
+        if self.executor is None:
+            for plugin_name in plugin_names:
+                yield self._measured_sheets(plugin_name)
+            return
+
+        futures = []
         for plugin_name in plugin_names:
+            # Import the plugin here rather than in the worker thread.
+            self.plugins.load(plugin_name)
+            futures.append(
+                self.executor.submit(
+                    lambda x: list(self._measured_sheets(x)), plugin_name
+                )
+            )
+        for future in futures:
+            yield future.result()
+
+    def _measured_sheets(self, plugin_name: str) -> Iterable[SheetData]:
+        """Return a plugin's sheets, measuring the plugin if collecting statistics."""
+        if self.stats is None:
+            return self._profiled_sheets(plugin_name)
+        return self.stats.plugin(
+            plugin_name, lambda: self._profiled_sheets(plugin_name)
+        )
+
+    def _profiled_sheets(self, plugin_name: str) -> Iterable[SheetData]:
+        """Return a plugin's sheets, profiling the plugin if named by --profile-plugins."""
+        if (profile := self.profiles.get(plugin_name)) is None:
+            return self._sheets(plugin_name)
+        return profile_sheets(profile, lambda: self._sheets(plugin_name))
+
+    def _sheets(self, plugin_name: str) -> Iterable[SheetData]:
+        """
+        Return a plugin's sheets.
+
+        When caching, sheets are reused if none of the top-level sections
+        the plugin reads have changed since they were cached.
+        """
+        if self.cache is None:
             self.logger.verbose(f"Plugin: {plugin_name}")
-            self.run_plugin(plugin_name)
+            return self.plugin_sheets(plugin_name)
 
-        self.output_format.finish()
+        key = self.cache.sheets_key(
+            plugin_name, plugin_sections(plugin_name), self.section_hashes
+        )
+        if (sheets := self.cache.get_sheets(key)) is not None:
+            self.logger.verbose(f"Plugin: {plugin_name} (cached)")
+            return sheets
 
-    def run_plugin(self, plugin_name: str) -> None:
-        """Run specific plugin and generate output."""
+        self.logger.verbose(f"Plugin: {plugin_name}")
+        sheets = list(self.plugin_sheets(plugin_name))
+        self.cache.put_sheets(key, sheets)
+        return sheets
+
+    def report_stats(self) -> None:
+        """Log the plugin statistics and optionally write them as JSON."""
+        if self.stats is None:
+            return
+        if self.args.stats:
+            for line in self.stats.summary():
+                self.logger.info(line)
+        if self.args.stats_json:
+            stats_path = cast(Path, self.args.output_dir) / Path(
+                f"{self.input_path.name}.STATS.json"
+            )
+            self.stats.write_json(stats_path, self.input_path)
+            self.logger.info(f"Statistics path: {stats_path}.")
+
+    def write_profiles(self) -> None:
+        """Write the profile of each plugin named by --profile-plugins to the log dir."""
+        for plugin_name, profile in self.profiles.items():
+            profile_path = Path(self.args.log_dir) / Path(
+                f"{self.input_path.name}.{plugin_name}"
+            )
+            paths = write_profile(profile, profile_path)
+            self.logger.info(f"Profile path: {', '.join(str(x) for x in paths)}.")
+
+    def plugin_sheets(self, plugin_name: str) -> Generator[SheetData, None, None]:
+        """Run specific plugin and return its sheets."""
         plugin = self.plugins[plugin_name]
         if plugin_name.startswith("report"):
-            for sheet_data in plugin.run(self.parsed_xml, self.plugins):
-                self.output_format.out(sheet_data)
-        else:
-            for sheet_data in plugin.run(self.parsed_xml):
-                self.output_format.out(sheet_data)
+            return plugin.run(self.parsed_xml, self.plugins)
+        return plugin.run(self.parsed_xml)
+
+    def run_plugin(self, plugin_name: str) -> None:
+        """Run specific plugin and generate output."""
+        output_format = self.output_format
+        assert output_format is not None, "run_all_plugins() not called."
+        for sheet_data in self.plugin_sheets(plugin_name):
+            output_format.out(sheet_data)
@@ -1,26 +1,243 @@
 """Plugin support tools."""
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
+import functools
 import importlib
 import pkgutil
 from types import ModuleType
-from typing import Iterator
+from typing import Iterator, Mapping
+
+from lxml import etree  # nosec
+
+from netgate_xml_to_xlsx.mytypes import Node
 
 from . import plugins
 from .plugins.base_plugin import BasePlugin
 
+# XML paths each plugin consumes, at the granularity of `index_nodes`:
+# a root child or an installedpackages child.
+# A plugin is only imported and run if at least one of its paths exists.
+# Plugins not listed here always run.
+PLUGIN_NODES: dict[str, tuple[str, ...]] = {
+    "aliases": ("aliases",),
+    "ca": ("ca",),
+    "cert": ("cert",),
+    "cron": ("cron",),
+    "dhcpd": ("dhcpd",),
+    "dhcpdv6": ("dhcpdv6",),
+    "dhcrelay": ("dhcrelay",),
+    "dhcrelay6": ("dhcrelay6",),
+    "diag": ("diag",),
+    "dnshaper": ("dnshaper",),
+    "filter": ("filter",),
+    "gateways": ("gateways",),
+    "hasync": ("hasync",),
+    "ifgroups": ("ifgroups",),
+    "installed_acme": ("installedpackages,acme",),
+    "installed_freeradius": ("installedpackages,freeradius",),
+    "installed_freeradiusclients": ("installedpackages,freeradiusclients",),
+    "installed_freeradiuseapconf": ("installedpackages,freeradiuseapconf",),
+    "installed_freeradiusinterfaces": ("installedpackages,freeradiusinterfaces",),
+    "installed_haproxy": ("installedpackages,haproxy",),
+    "installed_lightsquid": ("installedpackages,lightsquid",),
+    "installed_menu": ("installedpackages,menu",),
+    "installed_ntopng": ("installedpackages,ntopng",),
+    "installed_pfblockerng": ("installedpackages,pfblockerng",),
+    "installed_pfblockerngdnsbl": ("installedpackages,pfblockerngdnsbl",),
+    "installed_pfblockernglistsv4": ("installedpackages,pfblockernglistsv4",),
+    "installed_pfblockerngsync": ("installedpackages,pfblockerngsync",),
+    "installed_pfblockerngtopspammers": ("installedpackages,pfblockerngtopspammers",),
+    "installed_service": ("installedpackages,service",),
+    "installed_servicewatchdog": ("installedpackages,servicewatchdog",),
+    "installed_squid": ("installedpackages,squid",),
+    "installed_squidantivirus": ("installedpackages,squid",),
+    "installed_squidauth": ("installedpackages,squidauth",),
+    "installed_squidcache": ("installedpackages,squidcache",),
+    "installed_squidguardacl": ("installedpackages,squidguardacl",),
+    "installed_squidguarddefault": ("installedpackages,squidguarddefault",),
+    "installed_squidguarddest": ("installedpackages,squidguarddest",),
+    "installed_squidguardgeneral": ("installedpackages,squidguardgeneral",),
+    "installed_squidguardrewrite": ("installedpackages,squid",),
+    "installed_squidguardsync": ("installedpackages,squidguardsync",),
+    "installed_squidguardtime": ("installedpackages,squid",),
+    "installed_squidnac": ("installedpackages,squidnac",),
+    "installed_squidremote": ("installedpackages,squid",),
+    "installed_squidreversegeneral": ("installedpackages,squid",),
+    "installed_squidreversepeer": ("installedpackages,squid",),
+    "installed_squidreverseuri": ("installedpackages,squid",),
+    "installed_squidsync": ("installedpackages,squidsync",),
+    "installed_squidtraffic": ("installedpackages,squid",),
+    "installed_squidusers": ("installedpackages,squid",),
+    "installed_suricata": ("installedpackages,suricata",),
+    "installed_suricata_rule": ("installedpackages,suricata",),
+    "installed_suricata_sid_mgmt_lists": ("installedpackages,suricata",),
+    "installed_suricatasync": ("installedpackages,suricatasync",),
+    "installed_vpn_openvpn_export": ("installedpackages,vpn_openvpn_export",),
+    "installed_zabbixagentlts": ("installedpackages,zabbixagentlts",),
+    "installed_zabbixproxylts": ("installedpackages,zabbixproxylts",),
+    "installedpackages": ("installedpackages,package",),
+    "installedpackages_list": ("installedpackages",),
+    "interfaces": ("interfaces",),
+    "ipsec": ("ipsec",),
+    "nat": ("nat",),
+    "notifications": ("notifications",),
+    "ntpd": ("ntpd",),
+    "openvpn": ("openvpn",),
+    "ovpnserver": ("ovpnserver",),
+    "ppps": ("ppps",),
+    "proxyarp": ("proxyarp",),
+    "report_unknown_installedpackages": ("installedpackages",),
+    "rrd": ("rrd",),
+    "shaper": ("shaper",),
+    "snmpd": ("snmpd",),
+    "sshdata": ("sshdata",),
+    "staticroutes": ("staticroutes",),
+    "switches": ("switches",),
+    "sysctl": ("sysctl",),
+    "syslog": ("syslog",),
+    "system": (
+        "system",
+        "version",
+        "lastchange",
+    ),
+    "system_groups": ("system",),
+    "system_users": ("system",),
+    "unbound": ("unbound",),
+    "virtualip": ("virtualip",),
+    "vlans": ("vlans",),
+    "widgets": ("widgets",),
+    "wizardtemp": ("wizardtemp",),
+    "wol": ("wol",),
+}
+
 
 def iter_namespace(ns_pkg: ModuleType) -> Iterator[pkgutil.ModuleInfo]:
     """Gather all modules in namespace."""
     return pkgutil.iter_modules(ns_pkg.__path__, ns_pkg.__name__ + ".")
 
 
-def discover_plugins() -> dict[str, BasePlugin]:
-    """Discover and initialize plugins."""
-    discovered_plugins: dict[str, BasePlugin] = {}
-    for _, long_name, _ in iter_namespace(plugins):
-        if (name := long_name.split(".")[-1]).startswith("plugin_"):
-            name = name.replace("plugin_", "", 1)
-            discovered_plugins[name] = importlib.import_module(long_name).Plugin()
+class PluginRegistry(Mapping[str, BasePlugin]):
+    """
+    All available plugins.
+
+    Plugin names are discovered without importing the plugin modules.
+    A plugin is imported and instantiated the first time it is accessed.
+    """
+
+    def __init__(self) -> None:
+        """Discover plugin names."""
+        self.module_names: dict[str, str] = {}
+        for _, long_name, _ in iter_namespace(plugins):
+            if (name := long_name.split(".")[-1]).startswith("plugin_"):
+                name = name.replace("plugin_", "", 1)
+                self.module_names[name] = long_name
+        self.plugins: dict[str, BasePlugin] = {}
+
+    def __getitem__(self, name: str) -> BasePlugin:
+        """Return plugin instance, importing it if necessary."""
+        return self.load(name)
+
+    def load(self, name: str) -> BasePlugin:
+        """
+        Import and instantiate a plugin, unless already loaded.
+
+        Loading plugins before starting threads keeps imports out of the threads.
+
+        Returns:
+            Plugin instance.
+
+        """
+        if (plugin := self.plugins.get(name)) is None:
+            long_name = self.module_names[name]
+            plugin = importlib.import_module(long_name).Plugin()
+            self.plugins[name] = plugin
+        return plugin
+
+    def __contains__(self, name: object) -> bool:
+        """True if plugin is available. Does not import the plugin."""
+        return name in self.module_names
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over plugin names."""
+        return iter(self.module_names)
+
+    def __len__(self) -> int:
+        """Return number of available plugins."""
+        return len(self.module_names)
+
+
+@functools.cache
+def discover_plugins() -> PluginRegistry:
+    """
+    Discover plugins.
+
+    Plugins are discovered once per process and instantiated on first use.
+    The same plugin instances are reused for every input file,
+    so plugins must not keep state between calls to `run`.
+    """
+    return PluginRegistry()
+
+
+def index_section(section: Node) -> set[str]:
+    """
+    Index a single top-level section.
+
+    Returns:
+        Set of the section tag and "installedpackages,<tag>" for each installed package.
+
+    """
+    index = {section.tag}
+    if section.tag == "installedpackages":
+        for package in section.iterchildren(etree.Element):
+            index.add(f"installedpackages,{package.tag}")
+    return index
+
+
+def index_nodes(parsed_xml: Node) -> set[str]:
+    """
+    Index the nodes present in the document.
+
+    Returns:
+        Set of root child tags and "installedpackages,<tag>" for each installed package.
+
+    """
+    index = set()
+    for child in parsed_xml.iterchildren(etree.Element):
+        index |= index_section(child)
+    return index
+
+
+def plugin_sections(plugin_name: str) -> set[str] | None:
+    """
+    Return the top-level sections a plugin reads.
+
+    Returns:
+        Set of root child tags or None if the plugin is not in PLUGIN_NODES.
+
+    """
+    if (paths := PLUGIN_NODES.get(plugin_name)) is None:
+        return None
+    return {x.split(",")[0] for x in paths}
+
+
+def plugins_to_run(plugin_names: list[str], node_index: set[str]) -> list[str]:
+    """
+    Select plugins whose nodes are present in the document.
+
+    Args:
+        plugin_names:
+            Configured plugins in the order they are to be run.
+
+        node_index:
+            Nodes present in the document (see `index_nodes`).
+
+    Returns:
+        Plugin names to run, in configured order.
 
-    return discovered_plugins
+    """
+    result = []
+    for plugin_name in plugin_names:
+        paths = PLUGIN_NODES.get(plugin_name)
+        if paths is None or any(x in node_index for x in paths):
+            result.append(plugin_name)
+    return result
@@ -11,7 +11,13 @@ import lxml  # nosec
 from netgate_xml_to_xlsx.mytypes import Node
 from netgate_xml_to_xlsx.sheetdata import SheetData
 
-from .support.elements import nice_address_sort, unescape, xml_findall, xml_findone
+from .support.elements import (
+    nice_address_sort,
+    unescape,
+    xml_child_index,
+    xml_findall,
+    xml_index_findone,
+)
 
 
 def split_commas(data: str | list, make_int: bool = False) -> list[int | str]:
@@ -277,17 +283,38 @@ class BasePlugin(ABC):
         path.reverse()
         return "/".join(path)
 
+    def load_row(self, node: Node | None, node_names: list[str] | None = None) -> list:
+        """
+        Load adjusted node elements into a row, one column per node name.
+
+        The node's children are walked once and the index reused for the
+        unknown element check and every column.
+
+        Args:
+            node: Node to examine. If None, every column is empty.
+
+            node_names: Columns to load. Defaults to the plugin's node names.
+
+        Returns:
+            List of adjusted values.
+
+        """
+        if node_names is None:
+            node_names = self.node_names
+        if node is None:
+            return [""] * len(node_names)
+        index = xml_child_index(node)
+        self.report_unknown_node_elements(node, node_names, index)
+        return [self.adjust_node(xml_index_findone(node, index, x)) for x in node_names]
+
     def load_cell(self, node: Node, node_names: list[str]) -> str:
         """Load node elements into a single cell."""
         if node is None:
             return ""
 
         cell = []
-        self.report_unknown_node_elements(node, node_names)
-        for node_name in node_names:
-            cell.append(
-                f"{node_name}: {self.adjust_node(xml_findone(node, node_name))}"
-            )
+        for node_name, value in zip(node_names, self.load_row(node, node_names)):
+            cell.append(f"{node_name}: {value}")
         return "\n".join(cell)
 
     def load_cells(self, nodes: list[Node], node_names: list[str]) -> str:
@@ -336,7 +363,10 @@ class BasePlugin(ABC):
             return ""
 
     def report_unknown_node_elements(
-        self, node: Node, node_names: list[str] | None = None
+        self,
+        node: Node,
+        node_names: list[str] | None = None,
+        index: dict[str, list[Node]] | None = None,
     ) -> bool:
         """
         Report if any unknown node elements are present.
@@ -348,6 +378,8 @@ class BasePlugin(ABC):
 
             node_names: List of expected node names.
 
+            index: Optional child index (see `xml_child_index`) to avoid rescanning.
+
         Returns:
             True if unknown node names found.
         """
@@ -359,9 +391,14 @@ class BasePlugin(ABC):
             node_names = self.node_names
         fn_set = set(node_names)
 
-        for child in node.getchildren():
-            if child.tag not in fn_set:
-                unknowns.append(child.tag)
+        if index is None:
+            for child in node.getchildren():
+                if child.tag not in fn_set:
+                    unknowns.append(child.tag)
+        else:
+            for tag, children in index.items():
+                if tag not in fn_set:
+                    unknowns.extend([tag] * len(children))
 
         if unknowns:
             path = self.node_path(node)
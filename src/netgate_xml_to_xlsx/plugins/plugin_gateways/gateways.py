@@ -68,6 +68,9 @@ class Plugin(BasePlugin):
         if gateways_node is None:
             return
 
+        # Reset from any previous run.
+        self.gateway_name = None
+
         # Load default IPV4 and IPV6 gateways.
         self.default_gateways["defaultgw4"] = self.adjust_node(
             xml_findone(gateways_node, "defaultgw4")
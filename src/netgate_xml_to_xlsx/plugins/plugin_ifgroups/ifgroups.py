@@ -6,7 +6,7 @@ from typing import Generator
 from netgate_xml_to_xlsx.mytypes import Node
 
 from ..base_plugin import BasePlugin, SheetData
-from ..support.elements import xml_findall, xml_findone
+from ..support.elements import xml_findall
 
 NODE_NAMES = "ifname,members,descr"
 
@@ -43,12 +43,7 @@ class Plugin(BasePlugin):
             return
 
         for node in ifgroups_nodes:
-            self.report_unknown_node_elements(node)
-            row = []
-
-            for node_name in self.node_names:
-                value = self.adjust_node(xml_findone(node, node_name))
-                row.append(value)
+            row = self.load_row(node)
 
             rows.append(self.sanity_check_node_row(node, row))
 
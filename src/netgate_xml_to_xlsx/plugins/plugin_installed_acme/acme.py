@@ -123,10 +123,7 @@ class Plugin(BasePlugin):
             item_nodes = xml_findall(certs_node, "item")
 
             for item_node in item_nodes:
-                self.report_unknown_node_elements(item_node)
-                row = []
-                for node_name in self.node_names:
-                    row.append(self.adjust_node(xml_findone(item_node, node_name)))
+                row = self.load_row(item_node)
 
             self.sanity_check_node_row(item_node, row)
             rows.append(row)
@@ -154,13 +154,7 @@ class Plugin(BasePlugin):
         rows = []
 
         for node in nodes:
-            self.report_unknown_node_elements(node, node_names)
-            row = []
-
-            for node_name in node_names:
-                value = self.adjust_node(xml_findone(node, node_name))
-
-                row.append(value)
+            row = self.load_row(node, node_names)
 
             self.sanity_check_node_row(node, row)
             rows.append(row)
@@ -197,12 +191,7 @@ class Plugin(BasePlugin):
         rows = []
 
         for node in nodes:
-            self.report_unknown_node_elements(node, node_names)
-            row = []
-
-            for node_name in node_names:
-                value = self.adjust_node(xml_findone(node, node_name))
-                row.append(value)
+            row = self.load_row(node, node_names)
 
             rows.append(self.sanity_check_node_row(node, row))
 
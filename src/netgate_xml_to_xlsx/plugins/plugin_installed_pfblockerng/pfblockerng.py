@@ -50,11 +50,7 @@ class Plugin(BasePlugin):
         self.report_unknown_node_elements(pf_node, "config".split(","))
 
         node = xml_findone(pf_node, "config")
-        self.report_unknown_node_elements(node)
-
-        row = []
-        for node_name in self.node_names:
-            row.append(self.adjust_node(xml_findone(node, node_name)))
+        row = self.load_row(node)
         rows.append(self.sanity_check_node_row(node, row))
 
         yield SheetData(
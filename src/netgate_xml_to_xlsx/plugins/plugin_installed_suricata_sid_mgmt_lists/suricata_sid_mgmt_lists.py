@@ -74,10 +74,7 @@ class Plugin(BasePlugin):
         nodes = xml_findall(suricata_node, "sid_mgmt_lists,item")
 
         for node in nodes:
-            self.report_unknown_node_elements(node)
-            row = []
-            for node_name in self.node_names:
-                row.append(self.adjust_node(xml_findone(node, node_name)))
+            row = self.load_row(node)
             self.sanity_check_node_row(node, row)
 
             rows.append(self.sanity_check_node_row(node, row))
@@ -160,32 +160,29 @@ class Plugin(BasePlugin):
 
         return []
 
-    def gather_phase1s(self, node_in: Node) -> list[list[str]]:
+    def gather_phase1s(self, node_in: Node, node_names: list[str]) -> list[list[str]]:
         """IPSEC Phase 1 information."""
         rows = []
 
         phase1_nodes = xml_findall(node_in, "phase1")
 
         for node in phase1_nodes:
-            self.report_unknown_node_elements(node)
-            row = []
-            for node_name in self.node_names:
-                row.append(self.adjust_node(xml_findone(node, node_name)))
+            row = self.load_row(node, node_names)
             rows.append(self.sanity_check_node_row(node, row))
 
         rows.sort()
         return rows
 
-    def gather_phase2s(self, node_in: Node) -> list[list[str]]:
+    def gather_phase2s(self, node_in: Node, node_names: list[str]) -> list[list[str]]:
         """IPSEC Phase 2 information."""
         rows = []
 
         phase2_nodes = xml_findall(node_in, "phase2")
 
         for node in phase2_nodes:
-            self.report_unknown_node_elements(node)
+            self.report_unknown_node_elements(node, node_names)
             row = []
-            for node_name in self.node_names:
+            for node_name in node_names:
                 row.append(self.adjust_nodes(xml_findall(node, node_name)))
             rows.append(self.sanity_check_node_row(node, row))
 
@@ -212,32 +209,30 @@ class Plugin(BasePlugin):
         if not keep_processing:
             return
 
-        self.display_name = "IPSEC Client"
-        self.node_names = CLIENT_NODENAMES.split(",")
+        # Sheet names and headers are local so the plugin can be reused.
+        node_names = CLIENT_NODENAMES.split(",")
         rows = self.gather_client(node)
         if rows is not None and len(rows) > 0:
             yield SheetData(
-                sheet_name=self.display_name,
-                header_row=self.node_names,
+                sheet_name=f"{self.display_name} Client",
+                header_row=node_names,
                 data_rows=rows,
             )
 
-        self.display_name = "IPSEC Phase 1"
-        self.node_names = PHASE1_NODENAMES.split(",")
-        rows = self.gather_phase1s(node)
+        node_names = PHASE1_NODENAMES.split(",")
+        rows = self.gather_phase1s(node, node_names)
         if rows is not None and len(rows) > 0:
             yield SheetData(
-                sheet_name=self.display_name,
-                header_row=self.node_names,
+                sheet_name=f"{self.display_name} Phase 1",
+                header_row=node_names,
                 data_rows=rows,
             )
 
-        self.display_name = "IPSEC Phase 2"
-        self.node_names = PHASE2_NODENAMES.split(",")
-        rows = self.gather_phase2s(node)
+        node_names = PHASE2_NODENAMES.split(",")
+        rows = self.gather_phase2s(node, node_names)
         if rows is not None and len(rows) > 0:
             yield SheetData(
-                sheet_name=self.display_name,
-                header_row=self.node_names,
+                sheet_name=f"{self.display_name} Phase 2",
+                header_row=node_names,
                 data_rows=rows,
             )
@@ -67,12 +67,7 @@ class Plugin(BasePlugin):
         if node is None:
             return
 
-        self.report_unknown_node_elements(node)
-        row = []
-
-        for node_name in self.node_names:
-            value = self.adjust_node(xml_findone(node, node_name))
-            row.append(value)
+        row = self.load_row(node)
 
         rows.append(self.sanity_check_node_row(node, row))
 
@@ -77,6 +77,8 @@ class Plugin(BasePlugin):
         if node is None:
             return
 
+        # Header is built while adjusting the nodes. Reset from any previous run.
+        self.node_names = []
         row = []
         for child in node.getchildren():
             row.append(self.adjust_node(child))
@@ -28,7 +28,7 @@ class Plugin(BasePlugin):
 
     def run(self, parsed_xml: Node) -> Generator[SheetData, None, None]:
         """Gather information."""
-        node = xml_findone(parsed_xml, "ppps")
+        node = xml_findone(parsed_xml, "proxyarp")
         if node is None:
             return
 
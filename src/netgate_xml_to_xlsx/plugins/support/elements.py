@@ -1,13 +1,52 @@
 """Extract elements from XML."""
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
+import functools
 import html
 import ipaddress
 import re
+from collections import Counter
+from typing import Callable
+
+from lxml import etree  # nosec
 
 from netgate_xml_to_xlsx.errors import NodeError
 from netgate_xml_to_xlsx.mytypes import Node
 
+Selector = Callable[[Node], list[Node]]
+
+# A single child element name.
+TAG_RE = re.compile(r"^[A-Za-z_][\w.-]*$")
+
+# Elements whose contents are replaced by sanitize_xml.
+SANITIZE_TAGS = (
+    "authorizedkeys",
+    "bcrypt-hash",
+    "clientcert_ca",
+    "clientcert_crl",
+    "encryption_password",
+    "ha_certificates",
+    "lighttpd_ls_password",
+    "password",
+    "pre-shared-key",
+    "prv",
+    "private-key",
+    "radius_secret",
+    "shared_key",
+    "ssloffloadcert",
+    "stats_password",
+    "tls",
+)
+
+# encryption_password is matched to the last closing tag on the line,
+# all other elements to the first.
+SANITIZE_RE = re.compile(
+    "<(encryption_password)>.*</encryption_password>"
+    r"|<({})>.*?</\2>".format(
+        "|".join(re.escape(x) for x in SANITIZE_TAGS if x != "encryption_password")
+    )
+)
+
 
 def unescape(value: str | None) -> str:
     """Unescape XML entities."""
@@ -18,29 +57,30 @@ def unescape(value: str | None) -> str:
     return html.unescape(value)
 
 
-def sanitize_xml(raw_xml: str) -> str:
-    """Sanitize the xml."""
-    regexes = (
-        re.compile("(<authorizedkeys>).*?(</authorizedkeys>)"),
-        re.compile("(<bcrypt-hash>).*?(</bcrypt-hash>)"),
-        re.compile("(<clientcert_ca>).*?(</clientcert_ca>)"),
-        re.compile("(<clientcert_crl>).*?(</clientcert_crl>)"),
-        re.compile("(<encryption_password>).*(</encryption_password>)"),
-        re.compile("(<ha_certificates>).*?(</ha_certificates>)"),
-        re.compile("(<lighttpd_ls_password>).*?(</lighttpd_ls_password>)"),
-        re.compile("(<password>).*?(</password>)"),
-        re.compile("(<pre-shared-key>).*?(</pre-shared-key>)"),
-        re.compile("(<prv>).*?(</prv>)"),
-        re.compile("(<private-key>).*?(</private-key>)"),
-        re.compile("(<radius_secret>).*?(</radius_secret>)"),
-        re.compile("(<shared_key>).*?(</shared_key>)"),
-        re.compile("(<ssloffloadcert>).*?(</ssloffloadcert>)"),
-        re.compile("(<stats_password>).*?(</stats_password>)"),
-        re.compile("(<tls>).*?(</tls>)"),
-    )
-    for regex in regexes:
-        raw_xml = regex.sub(r"\1SANITIZED\2", raw_xml)
-    return raw_xml
+def sanitize_xml(raw_xml: str, counts: Counter | None = None) -> str:
+    """
+    Sanitize the xml.
+
+    Replace the contents of each sensitive element in a single pass.
+    Only contents on a single line are replaced.
+
+    Args:
+        raw_xml: XML text.
+
+        counts: Optional counter incremented by tag for each element sanitized.
+
+    Returns:
+        Sanitized XML text.
+
+    """
+
+    def replace(match: re.Match) -> str:
+        tag = match.group(1) or match.group(2)
+        if counts is not None:
+            counts[tag] += 1
+        return f"<{tag}>SANITIZED</{tag}>"
+
+    return SANITIZE_RE.sub(replace, raw_xml)
 
 
 def is_digits_and_(data: str, and_val: str = ".") -> bool:
@@ -111,6 +151,46 @@ def xml_findone(in_node: Node, el_path: str) -> Node | None:
     return found[0]
 
 
+def xml_child_index(in_node: Node) -> dict[str, list[Node]]:
+    """
+    Index a node's child elements by tag in a single pass.
+
+    Returns:
+        Dictionary of tag: list of child nodes with that tag, in document order.
+
+    """
+    index: dict[str, list[Node]] = {}
+    for child in in_node.iterchildren(etree.Element):
+        if (children := index.get(child.tag)) is None:
+            index[child.tag] = [child]
+        else:
+            children.append(child)
+    return index
+
+
+def xml_index_findone(
+    in_node: Node, index: dict[str, list[Node]], el_path: str
+) -> Node | None:
+    """
+    Find a single child using a child index (see `xml_child_index`).
+
+    Paths that are not a direct child name fall back to `xml_findone`.
+    Raise exception if more than one element is found.
+    If no element is found, return None.
+    """
+    if not TAG_RE.match(el_path):
+        return xml_findone(in_node, el_path)
+
+    found = index.get(el_path)
+    if not found:
+        return None
+
+    if len(found) > 1:
+        raise NodeError(f"Found more than one result for: {el_path}.")
+
+    return found[0]
+
+
 def xml_node_exists(in_node: Node, el_path: str) -> bool:
     """
     True if node exists, else False.
@@ -126,6 +206,44 @@ def xml_node_exists(in_node: Node, el_path: str) -> bool:
     return True
 
 
+@functools.lru_cache(maxsize=1024)
+def compile_selector(el_path: str) -> Selector:
+    """
+    Compile comma-delimited XML path into a reusable selector.
+
+    Selectors are cached on the path string so the path is only parsed once.
+    Use `compile_selector.cache_info()` for hit/miss counts.
+
+    Args:
+        el_path:
+            Comma-delimited XML element hierarchy.
+            If "pfsense" is first element, remove it.
+            (etree parses "pfsense" into the "root")
+
+    Returns:
+        Callable returning the list of matching nodes for a given node.
+
+    Raises:
+        NodeError if the path is not a valid selector.
+
+    """
+    path = el_path.split(",")
+    if path[0] == "pfsense":
+        if len(path) == 1:
+            return lambda in_node: []
+        path = path[1:]
+    selector = "/".join(path)
+
+    if TAG_RE.match(selector):
+        # Direct children. Cheaper than evaluating a path.
+        return lambda in_node: list(in_node.iterchildren(selector))
+
+    try:
+        return etree.XPath(selector)
+    except etree.XPathSyntaxError as err:
+        raise NodeError(f"Selector: ({selector}). {err}.")
+
+
 def xml_findall(in_node: Node, el_path: str) -> list[Node]:
     """
     Find all instances of the XML path.
@@ -143,18 +261,9 @@ def xml_findall(in_node: Node, el_path: str) -> list[Node]:
             List of found Nodes.
 
     """
-    path = el_path.split(",")
-    if path[0] == "pfsense":
-        if len(path) == 1:
-            return []
-        path = path[1:]
-    selector = "/".join(path)
-
     try:
-        nodes = in_node.findall(selector)
-    except SyntaxError as err:
-        raise NodeError(
-            f"{in_node.getparent()}/{in_node.tag}. Selector: ({selector}). {err}."
-        )
+        selector = compile_selector(el_path)
+    except NodeError as err:
+        raise NodeError(f"{in_node.getparent()}/{in_node.tag}. {err}")
 
-    return nodes
+    return selector(in_node)
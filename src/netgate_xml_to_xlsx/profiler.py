@@ -0,0 +1,147 @@
+"""cProfile output for pstats and flame graph tools."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import cProfile
+import pstats
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .sheetdata import SheetData
+
+# Stacks below this many microseconds are omitted from collapsed output.
+MIN_MICROSECONDS = 1
+
+# cProfile function key: (filename, line number, function name).
+Function = tuple[str, int, str]
+
+
+def frame_label(func: Function) -> str:
+    """Return a flame graph frame name for a cProfile function key."""
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-in.
+        label = name
+    else:
+        label = f"{name} ({Path(filename).name}:{lineno})"
+    # Semicolons separate frames.
+    return label.replace(";", ":")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> list[str]:
+    """
+    Convert profile statistics to collapsed stacks.
+
+    cProfile records callers rather than complete stacks, so each function's
+    time is divided between its callers in proportion to the time spent
+    under each caller. Recursive calls are folded into the first occurrence.
+
+    Args:
+        stats: Profile statistics.
+
+    Returns:
+        One "frame;frame;frame microseconds" line per stack, as read by
+        flamegraph.pl, speedscope and similar tools.
+
+    """
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Function, list[Function]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            callees[caller].append(func)
+
+    totals: dict[str, float] = defaultdict(float)
+
+    def walk(func: Function, stack: list[Function], seconds: float) -> None:
+        _, _, own_seconds, cumulative_seconds, _ = entries[func]
+        if cumulative_seconds <= 0 or seconds * 1_000_000 < MIN_MICROSECONDS:
+            return
+        share = min(1.0, seconds / cumulative_seconds)
+        stack = [*stack, func]
+        totals[";".join(frame_label(x) for x in stack)] += own_seconds * share
+        for callee in callees[func]:
+            if callee in stack:
+                continue
+            walk(callee, stack, entries[callee][4][func][3] * share)
+
+    for func, (_, _, _, cumulative_seconds, callers) in entries.items():
+        if not callers:
+            walk(func, [], cumulative_seconds)
+
+    lines = []
+    for stack_text, seconds in sorted(totals.items()):
+        if (microseconds := round(seconds * 1_000_000)) >= MIN_MICROSECONDS:
+            lines.append(f"{stack_text} {microseconds}")
+    return lines
+
+
+def write_profile(profile: cProfile.Profile, path: Path) -> list[Path]:
+    """
+    Write a profile as pstats and as collapsed stacks.
+
+    Args:
+        profile: Profile to write.
+
+        path: Output path without suffix. Writes path.pstats and path.collapsed.
+
+    Returns:
+        Files written.
+
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pstats_path = path.with_name(f"{path.name}.pstats")
+    collapsed_path = path.with_name(f"{path.name}.collapsed")
+
+    profile.dump_stats(pstats_path)
+    lines = collapsed_stacks(pstats.Stats(profile))
+    collapsed_path.write_text("".join(f"{x}\n" for x in lines), encoding="utf-8")
+    return [pstats_path, collapsed_path]
+
+
+@contextmanager
+def profiled(path: Path) -> Iterator[cProfile.Profile]:
+    """
+    Profile a block and write the profile, even if the block fails.
+
+    Args:
+        path: Output path without suffix, as for write_profile.
+
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        write_profile(profile, path)
+
+
+def profile_sheets(
+    profile: cProfile.Profile, run: Callable[[], Iterable[SheetData]]
+) -> Iterator[SheetData]:
+    """
+    Run a plugin and yield its sheets, profiling only the plugin's own work.
+
+    Args:
+        profile: Profile to add to. Other plugins must not run at the same time:
+            only one profile can be enabled at a time from Python 3.12,
+            and it then records every thread.
+
+        run: Function returning the plugin's sheets.
+
+    """
+    profile.enable()
+    try:
+        sheets = iter(run())
+    finally:
+        profile.disable()
+    while True:
+        profile.enable()
+        try:
+            sheet_data = next(sheets, None)
+        finally:
+            profile.disable()
+        if sheet_data is None:
+            return
+        yield sheet_data
@@ -1,17 +1,136 @@
 """SheetData."""
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
+import sys
+from collections.abc import Sequence
+from typing import Any, Iterator, Protocol
+
+# Column widths of rotated sheets.
+ROTATED_NAME_WIDTH = 60
+ROTATED_DATA_WIDTH = 80
+
+
+class Rows(Protocol):
+    """Rows of a sheet: any sized iterable of rows, e.g. a list or ColumnRows."""
+
+    def __len__(self) -> int:
+        ...
+
+    def __iter__(self) -> Iterator[Any]:
+        ...
+
+
+class ColumnRows(Sequence):
+    """
+    Rows stored column-wise, one list per column.
+
+    Avoids a list per row for sheets with many rows. Rows are returned as tuples.
+    """
+
+    __slots__ = ("columns", "row_count")
+
+    def __init__(self, columns: list[list[str]]) -> None:
+        """
+        Column-wise rows.
+
+        Args:
+            columns: Values of each column. All columns must have the same length.
+
+        """
+        lengths = {len(x) for x in columns}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}.")
+        self.columns = columns
+        self.row_count = lengths.pop() if lengths else 0
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> tuple[str, ...] | list[tuple[str, ...]]:
+        if isinstance(index, slice):
+            return [self._row(x) for x in range(*index.indices(self.row_count))]
+        return self._row(index)
+
+    def _row(self, index: int) -> tuple[str, ...]:
+        return tuple(x[index] for x in self.columns)
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        return zip(*self.columns)
+
+
+class RotatedRows(Sequence):
+    """
+    Rotated view of a sheet's rows without copying them.
+
+    Row i is the i-th header followed by the i-th value of each data row.
+    As with zip, rows stop at the shortest of the header and data rows.
+    Each row is built when it is read.
+    """
+
+    __slots__ = ("header_row", "data_rows", "row_count")
+
+    def __init__(self, header_row: list[str], data_rows: Rows) -> None:
+        """
+        Rotated rows.
+
+        Args:
+            header_row: Header of the sheet being rotated.
+
+            data_rows: Rows of the sheet being rotated.
+
+        """
+        self.header_row = header_row
+        self.data_rows = data_rows
+        self.row_count: int | None = None
+
+    def __len__(self) -> int:
+        if self.row_count is None:
+            if isinstance(self.data_rows, ColumnRows):
+                width = len(self.data_rows.columns)
+            else:
+                width = min((len(x) for x in self.data_rows), default=sys.maxsize)
+            self.row_count = min(len(self.header_row), width)
+        return self.row_count
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> tuple[str, ...] | list[tuple[str, ...]]:
+        if isinstance(index, slice):
+            return [self._row(x) for x in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError("rotated row index out of range")
+        return self._row(index % len(self))
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        for index in range(len(self)):
+            yield self._row(index)
+
+    def _row(self, index: int) -> tuple[str, ...]:
+        if isinstance(self.data_rows, ColumnRows):
+            return (self.header_row[index], *self.data_rows.columns[index])
+        return (self.header_row[index], *(x[index] for x in self.data_rows))
+
 
 class SheetData:
     """All information required to display a worksheet."""
 
+    __slots__ = (
+        "sheet_name",
+        "header_row",
+        "data_rows",
+        "column_widths",
+        "ok_to_rotate",
+    )
+
     def __init__(
         self,
         *,
         sheet_name: str = "",
-        header_row: list[str] = [],
-        data_rows: list[list[str]] = [],
-        column_widths: list[int] = [],
+        header_row: list[str] | None = None,
+        data_rows: Rows | None = None,
+        column_widths: list[int] | None = None,
         ok_to_rotate: bool = True,
     ) -> None:
         """
@@ -24,10 +143,11 @@ class SheetData:
                 Name of this sheet/section.
 
             header_row:
-                Top row.
+                Top row. Names are interned as they repeat in every sheet of a type.
 
             data_rows:
-                Data to output.
+                Data to output. A list of rows, a ColumnRows or RotatedRows view,
+                or any other sized iterable of rows.
 
             column_widths:
                 With of the spreadsheet columns.
@@ -38,8 +158,54 @@ class SheetData:
 
         """
         self.sheet_name = sheet_name
-        self.header_row = header_row
-        self.data_rows = data_rows
-        self.column_widths = [] if column_widths is None else column_widths
-        self.column_widths = [int(x) for x in self.column_widths]
+        self.header_row = [
+            sys.intern(str(x)) if isinstance(x, str) else x for x in header_row or []
+        ]
+        self.data_rows = [] if data_rows is None else data_rows
+        self.column_widths = [int(x) for x in column_widths or []]
         self.ok_to_rotate = ok_to_rotate
+
+    @classmethod
+    def from_columns(
+        cls,
+        *,
+        sheet_name: str,
+        header_row: list[str],
+        columns: list[list[str]],
+        column_widths: list[int] | None = None,
+        ok_to_rotate: bool = True,
+    ) -> "SheetData":
+        """
+        Create a sheet from column-wise data.
+
+        Args:
+            columns: Values of each column, in header_row order.
+
+            Other arguments as for SheetData.
+
+        """
+        return cls(
+            sheet_name=sheet_name,
+            header_row=header_row,
+            data_rows=ColumnRows(columns),
+            column_widths=column_widths,
+            ok_to_rotate=ok_to_rotate,
+        )
+
+    def rotated(self) -> "SheetData":
+        """
+        Return the sheet rotated so each header starts a row of values.
+
+        The new sheet views this sheet's rows rather than copying them,
+        so this sheet must not be changed while the rotated sheet is in use.
+        """
+        return SheetData(
+            sheet_name=self.sheet_name,
+            header_row=["name", *(["data"] * len(self.data_rows))],
+            data_rows=RotatedRows(self.header_row, self.data_rows),
+            column_widths=[
+                ROTATED_NAME_WIDTH,
+                *([ROTATED_DATA_WIDTH] * len(self.data_rows)),
+            ],
+            ok_to_rotate=self.ok_to_rotate,
+        )
@@ -0,0 +1,177 @@
+"""Per-plugin timing and memory statistics."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import datetime
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from importlib.metadata import version
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .sheetdata import SheetData
+
+
+class PluginStats:
+    """Resources used by one plugin."""
+
+    def __init__(self, plugin_name: str) -> None:
+        """
+        Initialize plugin statistics.
+
+        Args:
+            plugin_name: Plugin measured.
+
+        """
+        self.plugin_name = plugin_name
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_bytes = 0
+        self.sheets = 0
+        self.rows = 0
+        self.output_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        """Return the statistics as a dictionary."""
+        return {
+            "plugin": self.plugin_name,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_bytes": self.peak_bytes,
+            "sheets": self.sheets,
+            "rows": self.rows,
+            "output_seconds": round(self.output_seconds, 6),
+        }
+
+
+class Stats:
+    """
+    Collect per-plugin statistics for one input file.
+
+    Plugin time covers generating the plugin's sheets (including cache lookups).
+    Output time covers writing the sheets in every output format.
+    CPU time is measured per thread so it is correct with --plugin-workers.
+    Peak memory is the tracemalloc peak above the memory in use when the plugin
+    started. tracemalloc is process wide, so with --plugin-workers a plugin's peak
+    includes allocations by plugins running at the same time.
+    """
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        """
+        Initialize statistics.
+
+        Args:
+            trace_memory: Measure memory with tracemalloc. Slows plugins considerably.
+
+        """
+        self.trace_memory = trace_memory
+        self.plugins: dict[str, PluginStats] = {}
+        self.lock = threading.Lock()
+        self.started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+    def close(self) -> None:
+        """Stop measuring memory."""
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def _plugin_stats(self, plugin_name: str) -> PluginStats:
+        with self.lock:
+            if plugin_name not in self.plugins:
+                self.plugins[plugin_name] = PluginStats(plugin_name)
+            return self.plugins[plugin_name]
+
+    def plugin(
+        self, plugin_name: str, run: Callable[[], Iterable[SheetData]]
+    ) -> Iterator[SheetData]:
+        """
+        Run a plugin and yield its sheets, measuring the work done for each sheet.
+
+        Args:
+            plugin_name: Plugin to measure.
+
+            run: Function returning the plugin's sheets.
+
+        """
+        stats = self._plugin_stats(plugin_name)
+        with self._measure(stats):
+            sheets = iter(run())
+        while True:
+            with self._measure(stats):
+                sheet_data = next(sheets, None)
+            if sheet_data is None:
+                return
+            stats.sheets += 1
+            stats.rows += len(sheet_data.data_rows)
+            yield sheet_data
+
+    @contextmanager
+    def output(self, plugin_name: str) -> Iterator[None]:
+        """Measure writing one of a plugin's sheets."""
+        stats = self._plugin_stats(plugin_name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.output_seconds += time.perf_counter() - start
+
+    @contextmanager
+    def _measure(self, stats: PluginStats) -> Iterator[None]:
+        """Add the wall time, CPU time and peak memory of a block to stats."""
+        if self.trace_memory:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            stats.cpu_seconds += time.thread_time() - cpu
+            stats.wall_seconds += time.perf_counter() - wall
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] - current
+                stats.peak_bytes = max(stats.peak_bytes, peak)
+
+    def summary(self) -> list[str]:
+        """Return a table of plugin statistics, slowest first."""
+        lines = [
+            f"""{"Plugin":<36} {"Wall s":>8} {"CPU s":>8} {"Peak KB":>10} """
+            f"""{"Sheets":>6} {"Rows":>8} {"Out s":>8}"""
+        ]
+        plugins = sorted(self.plugins.values(), key=lambda x: -x.wall_seconds)
+        for stats in plugins:
+            lines.append(
+                f"{stats.plugin_name:<36} {stats.wall_seconds:>8.3f} "
+                f"{stats.cpu_seconds:>8.3f} {stats.peak_bytes // 1024:>10} "
+                f"{stats.sheets:>6} {stats.rows:>8} {stats.output_seconds:>8.3f}"
+            )
+        lines.append(
+            f"""{"Total":<36} {sum(x.wall_seconds for x in plugins):>8.3f} """
+            f"{sum(x.cpu_seconds for x in plugins):>8.3f} {'':>10} "
+            f"{sum(x.sheets for x in plugins):>6} {sum(x.rows for x in plugins):>8} "
+            f"{sum(x.output_seconds for x in plugins):>8.3f}"
+        )
+        return lines
+
+    def write_json(self, output_path: Path, input_path: Path) -> None:
+        """
+        Write the statistics as JSON for tracking over time.
+
+        Args:
+            output_path: JSON file to create.
+
+            input_path: Input file measured.
+
+        """
+        data = {
+            "input": input_path.name,
+            "version": version("netgate_xml_to_xlsx"),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "trace_memory": self.trace_memory,
+            "plugins": [x.as_dict() for x in self.plugins.values()],
+        }
+        output_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
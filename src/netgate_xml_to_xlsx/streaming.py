@@ -0,0 +1,286 @@
+"""Incremental parsing of large configuration files."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from collections import Counter
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from lxml import etree  # nosec
+
+from netgate_xml_to_xlsx.errors import NodeError
+from netgate_xml_to_xlsx.mytypes import Node
+
+from .loader import PARSER_DEFAULTS
+from .plugins.support.elements import TAG_RE, sanitize_xml
+
+# Elements at this depth (root is 0) are serialized whole by sanitize_stream.
+# Shallower elements are serialized a tag at a time.
+WRITE_DEPTH = 2
+
+# Indent of each level of a pretty printed tree.
+INDENT = "  "
+
+# Characters of whole lines read at a time by sanitize_stream.
+READ_SIZE = 1 << 20
+
+
+def iter_sections(
+    input_path: Path, options: dict[str, bool] | None = None
+) -> Iterator[tuple[str, Node, Node | None]]:
+    """
+    Parse XML incrementally, one top-level section at a time.
+
+    Yields an event as each top-level section starts and ends:
+        ("start", root, section): section has started but is not yet parsed.
+        ("end", root, section): section is completely parsed.
+        ("done", root, None): document is completely parsed.
+
+    The root holds every section the caller has not removed.
+    Callers should remove sections from the root once they are processed
+    so memory use is bounded by the largest section.
+
+    Args:
+        input_path: XML file to parse.
+
+        options: Parser options. Default: PARSER_DEFAULTS.
+
+    """
+    options = options or PARSER_DEFAULTS
+    events = etree.iterparse(str(input_path), events=("start", "end"), **options)
+    # The first event starts the root.
+    _, root = next(events)
+    depth = 1
+    for event, el in events:
+        if event == "start":
+            if depth == 1:
+                yield "start", root, el
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 1:
+            yield "end", root, el
+
+    yield "done", root, None
+
+
+def _sanitized_chunks(input_path: Path, counts: Counter | None) -> Iterator[bytes]:
+    """
+    Read XML a block of whole lines at a time and apply sanitize_xml to each block.
+
+    sanitize_xml only replaces contents on a single line,
+    so sanitizing whole lines a block at a time matches sanitizing the whole text.
+    """
+    with open(input_path, encoding="utf-8") as fh:
+        while lines := fh.readlines(READ_SIZE):
+            yield sanitize_xml("".join(lines), counts).encode("utf-8")
+
+
+def _iter_chunk_events(
+    chunks: Iterable[bytes], options: dict[str, bool]
+) -> Iterator[tuple[str, Node]]:
+    """Parse XML chunks incrementally, yielding (event, element) as iterparse does."""
+    parser = etree.XMLPullParser(events=("start", "end"), **options)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def _text_parents(events: Iterable[tuple[str, Node]]) -> list[bool]:
+    """
+    Find the elements above WRITE_DEPTH whose content includes text.
+
+    etree.tostring(pretty_print=True) only indents the children of elements
+    without text, which sanitize_stream cannot tell until the element ends.
+
+    Returns:
+        For each element above WRITE_DEPTH, in document order,
+        True if its text or the tail of any of its children is not None.
+
+    """
+    flags: list[bool] = []
+    # Index into flags of each open element above WRITE_DEPTH.
+    open_flags: list[int] = []
+    depth = 0
+    for event, el in events:
+        if event == "start":
+            if 0 < depth <= WRITE_DEPTH and (previous := el.getprevious()) is not None:
+                flags[open_flags[-1]] |= previous.tail is not None
+                el.getparent().remove(previous)
+            if depth < WRITE_DEPTH:
+                open_flags.append(len(flags))
+                flags.append(False)
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth < WRITE_DEPTH:
+            flags[open_flags.pop()] |= el.text is not None or any(
+                x.tail is not None for x in el
+            )
+        if depth <= WRITE_DEPTH:
+            el.clear(keep_tail=True)
+    return flags
+
+
+def _pretty_print(el: Node, level: int) -> None:
+    """
+    Indent el's descendants in place as etree.tostring(pretty_print=True) would.
+
+    Args:
+        el: Element to indent. Elements with text, and their descendants, are left as is.
+
+        level: Depth of el below the element being serialized.
+
+    """
+    if not len(el) or el.text is not None or any(x.tail is not None for x in el):
+        return
+    el.text = f"\n{INDENT * (level + 1)}"
+    for child in el:
+        if isinstance(child.tag, str):
+            _pretty_print(child, level + 1)
+        child.tail = f"\n{INDENT * (level + 1)}"
+    child.tail = f"\n{INDENT * level}"
+
+
+def sanitize_stream(
+    input_path: Path,
+    output_path: Path,
+    el_paths: list[str],
+    options: dict[str, bool] | None = None,
+    counts: Counter | None = None,
+) -> list[str]:
+    """
+    Sanitize XML incrementally.
+
+    Applies sanitize_xml to the text and the plugin el_paths_to_sanitize to each
+    element as it is parsed, then writes it pretty printed and discards it,
+    producing the same file as sanitizing the whole tree.
+    Memory use is bounded by the largest child of a top-level section
+    (a single rule, user, certificate, etc.) rather than the whole file.
+
+    The file is parsed twice: first to find which sections contain text
+    and so are not indented when pretty printed, then to write it.
+
+    Args:
+        input_path: XML file to sanitize.
+
+        output_path: Sanitized XML file to write.
+
+        el_paths: Comma-delimited element paths to sanitize.
+
+        options: Parser options. Default: PARSER_DEFAULTS.
+
+        counts: Optional counter incremented by tag for each element sanitized.
+
+    Returns:
+        Tags of the root node's children.
+
+    """
+    paths = set()
+    for el_path in el_paths:
+        tags = el_path.split(",")
+        if tags[0] == "pfsense":
+            tags = tags[1:]
+        if not all(TAG_RE.match(x) for x in tags):
+            raise NodeError(f"Cannot sanitize path while streaming: {el_path}.")
+        paths.add(tuple(tags))
+
+    options = options or PARSER_DEFAULTS
+    text_parents = iter(
+        _text_parents(_iter_chunk_events(_sanitized_chunks(input_path, None), options))
+    )
+    root_tags = []
+    path: list[str] = []
+
+    # Element writers for the elements being parsed above WRITE_DEPTH.
+    # None until the element's first child starts, so that childless elements
+    # are written whole (<tag/>) like the rest of the tree.
+    writers: list[AbstractContextManager | None] = []
+
+    # True for each element being parsed above WRITE_DEPTH if it is indented.
+    indented: list[bool] = []
+
+    # Written node at each depth whose tail has not been written.
+    pending: dict[int, Node] = {}
+
+    def write_gap(parent: Node, depth: int, child: Node | None = None) -> None:
+        """Write the content of parent preceding child (default: its end)."""
+        if writers[-1] is None:
+            writer = xf.element(parent.tag, dict(parent.attrib))
+            writer.__enter__()
+            writers[-1] = writer
+        # Comments and processing instructions have no events, so write them here.
+        while True:
+            previous = pending.pop(depth, None)
+            node = parent[0] if previous is None else previous.getnext()
+            if indented[-1]:
+                level = depth if node is not None else depth - 1
+                xf.write(f"\n{INDENT * level}")
+            elif previous is not None:
+                xf.write(previous.tail or "")
+            elif tuple(path) in paths and parent.text is not None:
+                # As BasePlugin.sanitize.
+                xf.write("SANITIZED")
+            else:
+                xf.write(parent.text or "")
+            if previous is not None:
+                parent.remove(previous)
+            if node is child:
+                return
+            xf.write(node, with_tail=False)
+            pending[depth] = node
+
+    depth = 0
+    events = _iter_chunk_events(_sanitized_chunks(input_path, counts), options)
+    with etree.xmlfile(str(output_path)) as xf:
+        for event, el in events:
+            if event == "start":
+                if 0 < depth <= WRITE_DEPTH:
+                    write_gap(el.getparent(), depth, el)
+                if depth:
+                    path.append(el.tag)
+                if depth < WRITE_DEPTH:
+                    writers.append(None)
+                    # A tree is pretty printed until an element with text.
+                    indented.append(
+                        (not indented or indented[-1]) and not next(text_parents)
+                    )
+                depth += 1
+                continue
+
+            depth -= 1
+            writer = writers[-1] if depth < WRITE_DEPTH else None
+            if writer is not None:
+                write_gap(el, depth + 1)
+                writer.__exit__(None, None, None)
+                writers.pop()
+                indented.pop()
+            else:
+                # As BasePlugin.sanitize.
+                if tuple(path) in paths and el.text is not None:
+                    el.text = "SANITIZED"
+                if depth < WRITE_DEPTH:
+                    writers.pop()
+                    indented.pop()
+                if depth <= WRITE_DEPTH:
+                    if not indented or indented[-1]:
+                        _pretty_print(el, depth)
+                    xf.write(el, with_tail=False)
+                    el.clear(keep_tail=True)
+
+            if depth <= WRITE_DEPTH:
+                pending[depth] = el
+            if depth == 1:
+                root_tags.append(el.tag)
+            if depth:
+                path.pop()
+
+    # Match the trailing newline of a pretty printed tree.
+    with open(output_path, "ab") as fh:
+        fh.write(b"\n")
+
+    return root_tags
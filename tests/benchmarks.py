@@ -0,0 +1,83 @@
+"""Benchmark gate and measurement helpers shared by the test modules."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import json
+import os
+import statistics
+import subprocess  # nosec
+import sys
+import time
+from typing import Callable
+
+import pytest
+
+# Set NETGATE_BENCHMARK=1 to run the benchmarks.
+# NETGATE_BENCHMARK_MB sets the largest benchmark input size.
+# NETGATE_BENCHMARK_ROUNDS sets the number of timed rounds of each benchmark.
+BENCHMARK = bool(os.environ.get("NETGATE_BENCHMARK"))
+BENCHMARK_MB = int(os.environ.get("NETGATE_BENCHMARK_MB", "200"))
+BENCHMARK_ROUNDS = int(os.environ.get("NETGATE_BENCHMARK_ROUNDS", "3"))
+
+# Time per unit at the largest scale may be at most this multiple of the smallest scale's.
+MAX_GROWTH = 2
+
+# Allowance for timer and scheduling noise in very short timings.
+NOISE_SECONDS = 0.01
+
+benchmark = pytest.mark.skipif(not BENCHMARK, reason="Set NETGATE_BENCHMARK=1 to run.")
+
+
+def measure(code: str, *argv: object) -> dict:
+    """
+    Run code in a fresh process so peak memory is not shared between measurements.
+
+    Args:
+        code: Python source printing a JSON object of measurements.
+
+        argv: Command line arguments passed to code.
+
+    Returns:
+        Measurements printed by code.
+
+    """
+    result = subprocess.run(  # nosec
+        [sys.executable, "-c", code, *(str(x) for x in argv)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def timed(func: Callable, rounds: int = BENCHMARK_ROUNDS) -> dict:
+    """
+    Time func over several rounds.
+
+    Args:
+        func: Function to time.
+
+        rounds: Number of times to call func.
+
+    Returns:
+        Minimum and mean seconds.
+
+    """
+    seconds = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return {"min": min(seconds), "mean": statistics.mean(seconds)}
+
+
+def assert_linear(seconds: dict[int, float]) -> None:
+    """
+    Assert time per unit does not grow with scale.
+
+    Args:
+        seconds: Seconds taken at each scale (e.g. rule count or MB).
+
+    """
+    smallest, largest = min(seconds), max(seconds)
+    limit = MAX_GROWTH * seconds[smallest] * largest / smallest + NOISE_SECONDS
+    assert seconds[largest] <= limit, seconds
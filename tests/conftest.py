@@ -0,0 +1,48 @@
+"""Shared test fixtures."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from netgate_xml_to_xlsx.parse_args import COMMANDS, parse_args
+
+
+@pytest.fixture
+def make_config(tmp_path) -> Callable[..., dict]:
+    """
+    Return a function building a configuration from command line arguments.
+
+    Arguments are parsed by parse_args, so options not given have their
+    command line defaults. Output and log directories default to tmp_path.
+    """
+
+    def make(*argv: str | Path, plugins: list[str] | None = None) -> dict:
+        """
+        Build a configuration.
+
+        Args:
+            argv: Command line arguments, including existing input files.
+                An optional leading command (e.g. diff) defaults to convert.
+
+            plugins: Plugins to run.
+
+        """
+        arguments = [str(x) for x in argv]
+        command = "convert"
+        if arguments and arguments[0] in COMMANDS:
+            command = arguments.pop(0)
+        args = parse_args(
+            [
+                command,
+                "--output-dir",
+                str(tmp_path),
+                "--log-dir",
+                str(tmp_path / "logs"),
+                *arguments,
+            ]
+        )
+        return {"args": args, "plugins": plugins or []}
+
+    return make
@@ -0,0 +1,344 @@
+"""Synthetic pfSense configurations for tests and benchmarks."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from pathlib import Path
+from typing import Iterator
+
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+# Elements written per chunk so large configurations are not built in memory.
+CHUNK_SIZE = 1000
+
+# Approximate bytes written per filter rule, including the sections scaled with it.
+BYTES_PER_RULE = 800
+
+RULES_HEADER = "tracker,type,interface,ipprotocol,protocol,source,destination,descr"
+
+header_xml = """\
+<?xml version="1.0"?>
+<pfsense>
+    <version>22.2</version>
+    <lastchange></lastchange>
+    <system>
+        <hostname>fw1</hostname>
+        <domain>example.com</domain>
+    </system>
+    <interfaces>
+        <wan>
+            <enable></enable>
+            <if>igb0</if>
+            <ipaddr>dhcp</ipaddr>
+        </wan>
+        <lan>
+            <enable></enable>
+            <if>igb1</if>
+            <ipaddr>10.0.0.1</ipaddr>
+            <subnet>16</subnet>
+        </lan>
+    </interfaces>
+"""
+
+rule_xml = """\
+        <rule>
+            <id></id>
+            <tracker>{i}</tracker>
+            <type>{type}</type>
+            <interface>{interface}</interface>
+            <ipprotocol>inet</ipprotocol>
+            <protocol>{protocol}</protocol>
+            <source>
+                <network>lan</network>
+            </source>
+            <destination>
+                <address>10.{a}.{b}.1</address>
+                <port>{port}</port>
+            </destination>
+            <descr><![CDATA[Rule {i} ÅÉÎ]]></descr>
+            <created>
+                <time>1647546443</time>
+                <username><![CDATA[admin@10.0.0.1 (Local Database)]]></username>
+            </created>
+        </rule>
+"""
+
+alias_xml = """\
+        <alias>
+            <name>alias{i}</name>
+            <type>host</type>
+            <address>10.1.{a}.{b} 10.2.{a}.{b}</address>
+            <descr><![CDATA[Alias {i}]]></descr>
+            <detail><![CDATA[first||second]]></detail>
+        </alias>
+"""
+
+nat_rule_xml = """\
+        <rule>
+            <source>
+                <any></any>
+            </source>
+            <destination>
+                <network>wanip</network>
+                <port>{port}</port>
+            </destination>
+            <ipprotocol>inet</ipprotocol>
+            <protocol>tcp</protocol>
+            <target>10.0.{a}.{b}</target>
+            <local-port>{port}</local-port>
+            <interface>wan</interface>
+            <descr><![CDATA[Forward {i}]]></descr>
+            <associated-rule-id>pass</associated-rule-id>
+        </rule>
+"""
+
+nat_outbound_xml = """\
+        <outbound>
+            <mode>automatic</mode>
+        </outbound>
+"""
+
+static_map_xml = """\
+            <staticmap>
+                <mac>00:08:a2:{a:02x}:{b:02x}:{c:02x}</mac>
+                <cid>host{i}</cid>
+                <ipaddr>10.0.{a}.{b}</ipaddr>
+                <hostname>host{i}</hostname>
+                <descr><![CDATA[Host {i}]]></descr>
+            </staticmap>
+"""
+
+dhcpd_header_xml = """\
+    <dhcpd>
+        <lan>
+            <enable></enable>
+            <range>
+                <from>10.0.200.10</from>
+                <to>10.0.200.250</to>
+            </range>
+"""
+
+cert_xml = """\
+    <cert>
+        <refid>cert{i}</refid>
+        <descr><![CDATA[Certificate {i}]]></descr>
+        <type>server</type>
+        <caref>ca0</caref>
+        <crt>{body}</crt>
+        <prv>{body}</prv>
+    </cert>
+"""
+
+package_xml = """\
+        <package>
+            <name>{name}</name>
+            <internal_name>{name}</internal_name>
+            <descr><![CDATA[{name} package]]></descr>
+            <version>1.0.0</version>
+        </package>
+"""
+
+haproxy_xml = """\
+        <haproxy>
+            <enable></enable>
+            <maxconn>1000</maxconn>
+            <ha_backends>
+                <item>
+                    <name>frontend</name>
+                    <status>active</status>
+                    <type>http</type>
+                    <a_extaddr>
+                        <item>
+                            <extaddr>wan_ipv4</extaddr>
+                            <extaddr_port>443</extaddr_port>
+                            <extaddr_ssl>yes</extaddr_ssl>
+                            <_index></_index>
+                        </item>
+                    </a_extaddr>
+                    <backend_serverpool>pool</backend_serverpool>
+                </item>
+            </ha_backends>
+            <ha_pools>
+                <item>
+                    <name>pool</name>
+                    <id>100</id>
+                    <ha_servers>
+                        <item>
+                            <name>web1</name>
+                            <address>10.0.0.10</address>
+                            <port>80</port>
+                        </item>
+                    </ha_servers>
+                    <check_type>HTTP</check_type>
+                    <balance>roundrobin</balance>
+                </item>
+            </ha_pools>
+        </haproxy>
+"""
+
+suricata_xml = """\
+        <suricata>
+            <config>
+                <enable_etopen_rules>on</enable_etopen_rules>
+                <autoruleupdate>1d_default</autoruleupdate>
+            </config>
+            <rule>
+                <interface>wan</interface>
+                <descr><![CDATA[WAN]]></descr>
+                <enable>on</enable>
+                <blockoffenders>on</blockoffenders>
+            </rule>
+        </suricata>
+"""
+
+pfblockerng_xml = """\
+        <pfblockerng>
+            <config>
+                <enable_cb>on</enable_cb>
+                <inbound_interface>wan</inbound_interface>
+                <pfb_hour>0</pfb_hour>
+            </config>
+        </pfblockerng>
+"""
+
+
+def coordinates(i: int) -> dict:
+    """Return distinct address octets for element i."""
+    return {"i": i, "a": i // 250 % 250, "b": i % 250 + 1, "c": i // 62500 % 250}
+
+
+def rule_values(i: int) -> dict:
+    """Return the values of filter rule i."""
+    return {
+        "type": ("pass", "block", "reject")[i % 3],
+        "interface": ("lan", "wan", "opt1")[i % 3],
+        "protocol": ("tcp", "udp")[i % 2],
+        "port": 1024 + i % 60000,
+        **coordinates(i),
+    }
+
+
+def chunks(template: str, count: int, values=coordinates) -> Iterator[str]:
+    """Yield count formatted copies of template, CHUNK_SIZE at a time."""
+    for start in range(0, count, CHUNK_SIZE):
+        yield "".join(
+            template.format(**values(i))
+            for i in range(start, min(start + CHUNK_SIZE, count))
+        )
+
+
+def generate_config(
+    rules: int,
+    aliases: int | None = None,
+    nat_rules: int | None = None,
+    static_maps: int | None = None,
+    certs: int | None = None,
+    packages: bool = True,
+) -> Iterator[str]:
+    """
+    Yield a synthetic pfSense configuration in chunks.
+
+    Sections other than the filter rules scale with the rule count by default.
+
+    Args:
+        rules: Number of filter rules.
+
+        aliases: Number of aliases. Default rules // 10.
+
+        nat_rules: Number of port forward rules. Default rules // 10.
+
+        static_maps: Number of DHCP static maps. Default rules // 10.
+
+        certs: Number of certificates. Default one per 1000 rules.
+
+        packages: Include the HAProxy, Suricata and pfBlockerNG packages.
+
+    """
+    aliases = rules // 10 if aliases is None else aliases
+    nat_rules = rules // 10 if nat_rules is None else nat_rules
+    static_maps = rules // 10 if static_maps is None else static_maps
+    certs = max(1, rules // 1000) if certs is None else certs
+
+    yield header_xml
+
+    yield "    <aliases>\n"
+    yield from chunks(alias_xml, aliases)
+    yield "    </aliases>\n"
+
+    yield "    <filter>\n"
+    yield from chunks(rule_xml, rules, rule_values)
+    yield "    </filter>\n"
+
+    yield "    <nat>\n"
+    yield from chunks(nat_rule_xml, nat_rules, rule_values)
+    yield nat_outbound_xml
+    yield "    </nat>\n"
+
+    yield dhcpd_header_xml
+    yield from chunks(static_map_xml, static_maps)
+    yield "        </lan>\n    </dhcpd>\n"
+
+    body = "TUlJQkl" * 200
+    yield from chunks(cert_xml, certs, lambda i: {"i": i, "body": body})
+
+    if packages:
+        yield "    <installedpackages>\n"
+        for name in ("haproxy", "suricata", "pfBlockerNG"):
+            yield package_xml.format(name=name)
+        yield haproxy_xml
+        yield suricata_xml
+        yield pfblockerng_xml
+        yield "    </installedpackages>\n"
+
+    yield "</pfsense>\n"
+
+
+def write_config(path: Path, rules: int, **kwargs) -> Path:
+    """
+    Write a synthetic pfSense configuration.
+
+    Args:
+        path: File to write.
+
+        rules: Number of filter rules.
+
+        kwargs: Other counts passed to generate_config.
+
+    Returns:
+        path
+
+    """
+    with open(path, "w", encoding="utf-8") as fh:
+        for chunk in generate_config(rules, **kwargs):
+            fh.write(chunk)
+    return path
+
+
+def rules_for_mb(size_mb: int) -> int:
+    """Return the approximate rule count of a configuration of size_mb."""
+    return max(CHUNK_SIZE, size_mb * 1024 * 1024 // BYTES_PER_RULE)
+
+
+def rules_sheet(count: int) -> SheetData:
+    """Return a sheet of count filter rules, as output by the filter plugin."""
+    header_row = RULES_HEADER.split(",")
+    rows = []
+    for i in range(count):
+        values = rule_values(i)
+        rows.append(
+            [
+                str(i),
+                values["type"],
+                values["interface"],
+                "inet",
+                values["protocol"],
+                "lan",
+                f"10.{values['a']}.{values['b']}.1:{values['port']}",
+                f"Rule {i} ÅÉÎ",
+            ]
+        )
+    return SheetData(
+        sheet_name="Rules",
+        header_row=header_row,
+        data_rows=rows,
+        column_widths=[20] * len(header_row),
+        ok_to_rotate=False,
+    )
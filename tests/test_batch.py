@@ -0,0 +1,41 @@
+"""Test batch processing."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import logging
+
+from netgate_xml_to_xlsx.batch import run_batch
+
+config_xml = """\
+<pfsense>
+    <aliases>
+        <alias>
+            <name>{name}</name>
+            <type>host</type>
+            <address>10.0.0.1</address>
+        </alias>
+    </aliases>
+</pfsense>
+"""
+
+
+def test_run_batch(tmp_path, caplog, make_config):
+    caplog.set_level(logging.INFO)
+    in_files = []
+    for name in ("one", "two", "three"):
+        in_file = tmp_path / f"{name}-sanitized.xml"
+        in_file.write_text(config_xml.format(name=name), encoding="utf-8")
+        in_files.append(in_file)
+    bad_file = tmp_path / "bad-sanitized.xml"
+    bad_file.write_text("<pfsense><aliases>", encoding="utf-8")
+    in_files.insert(1, bad_file)
+
+    config = make_config(*in_files, plugins=["aliases"])
+    results = run_batch(config, in_files, 2)
+
+    assert [x.in_filename for x in results] == in_files
+    assert [x.ok for x in results] == [True, False, True, True]
+    assert results[0].records[0].getMessage() == f"Processing: {in_files[0]}"
+    assert "Failed" in results[1].records[-1].getMessage()
+    for name in ("one", "two", "three"):
+        report = tmp_path / f"{name}-sanitized.xml.REPORT.txt"
+        assert f"Aliases: name: {name}\n" in report.read_text(encoding="utf-8")
@@ -0,0 +1,144 @@
+"""Benchmark loading, plugins, formats and end-to-end runs on synthetic configs."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import importlib.util
+import os
+from pathlib import Path
+from typing import Callable
+
+import pytest
+import toml
+
+from netgate_xml_to_xlsx.batch import process_file
+from netgate_xml_to_xlsx.formats import create_format
+from netgate_xml_to_xlsx.loader import load_xml
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.pfsense import PfSense
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+from .benchmarks import assert_linear, benchmark, timed
+from .synthetic import rules_sheet, write_config
+
+# NETGATE_BENCHMARK_SCALES sets the filter rule counts benchmarked.
+BENCHMARK_SCALES = [
+    int(x)
+    for x in os.environ.get("NETGATE_BENCHMARK_SCALES", "1000,10000,100000").split(",")
+]
+
+PLUGINS = toml.load(Path(__file__).parents[1] / "plugins.toml")["plugins"]
+
+# Output format benchmarked: (format, stream).
+BENCHMARK_FORMATS = [
+    ("txt", False),
+    ("xlsx", False),
+    ("xlsx", True),
+    ("sqlite", False),
+    ("jsonl", False),
+]
+if importlib.util.find_spec("pyarrow") is not None:
+    BENCHMARK_FORMATS.append(("parquet", False))
+
+
+@pytest.fixture(autouse=True)
+def log_level() -> None:
+    custom_log_level()
+
+
+@pytest.fixture(scope="module")
+def configs(tmp_path_factory) -> Callable[[int], Path]:
+    """Return a function writing, once per scale, a synthetic configuration."""
+    paths: dict[int, Path] = {}
+
+    def config_path(rules: int) -> Path:
+        if rules not in paths:
+            path = tmp_path_factory.mktemp("synthetic") / f"fw{rules}-sanitized.xml"
+            paths[rules] = write_config(path, rules)
+        return paths[rules]
+
+    return config_path
+
+
+def test_synthetic_config(tmp_path, caplog, make_config):
+    in_file = write_config(tmp_path / "fw-sanitized.xml", 20)
+    pfsense = PfSense(make_config(in_file, plugins=PLUGINS), in_file)
+
+    sheets = {x.sheet_name: x for x in pfsense.iter_sheets(PLUGINS)}
+
+    assert len(sheets["Filter Rules"].data_rows) == 20
+    assert len(sheets["Aliases"].data_rows) == 2
+    assert len(sheets["NAT"].data_rows) == 2
+    assert len(sheets["Certs"].data_rows) == 1
+    dhcpd = sheets["DHCPD"]
+    assert "host1" in dhcpd.data_rows[0][dhcpd.header_row.index("staticmap")]
+    assert "HAProxy (pools)" in sheets
+    assert "Suricata Rules" in sheets
+    assert "PF Block RNG" in sheets
+    assert [x for x in caplog.records if x.levelname == "WARNING"] == []
+
+
+@benchmark
+def test_load_benchmark(configs, record_property):
+    seconds = {}
+    for rules in BENCHMARK_SCALES:
+        path = configs(rules)
+        result = timed(lambda: load_xml(path))
+        record_property(f"load {rules} rules", result)
+        seconds[rules] = result["min"]
+
+    assert_linear(seconds)
+
+
+@benchmark
+def test_plugins_benchmark(configs, make_config, record_property):
+    seconds: dict[str, dict[int, float]] = {x: {} for x in PLUGINS}
+    for rules in BENCHMARK_SCALES:
+        path = configs(rules)
+        pfsense = PfSense(make_config(path, plugins=PLUGINS), path)
+        for plugin_name in PLUGINS:
+            result = timed(lambda: list(pfsense.plugin_sheets(plugin_name)))
+            record_property(f"plugin {plugin_name} {rules} rules", result)
+            seconds[plugin_name][rules] = result["min"]
+
+    for plugin_seconds in seconds.values():
+        assert_linear(plugin_seconds)
+
+
+@benchmark
+@pytest.mark.parametrize("output_format,stream", BENCHMARK_FORMATS)
+def test_formats_benchmark(tmp_path, record_property, output_format, stream):
+    def write(sheet_data: SheetData) -> None:
+        out = create_format(
+            {output_format: tmp_path / f"rules.{output_format}"},
+            ctx={"input_path": Path("fw.xml"), "stream": stream},
+        )
+        out.start()
+        out.out(sheet_data)
+        out.finish()
+
+    seconds = {}
+    for rules in BENCHMARK_SCALES:
+        sheet_data = rules_sheet(rules)
+        result = timed(lambda: write(sheet_data))
+        record_property(f"format {rules} rules", result)
+        seconds[rules] = result["min"]
+
+    assert_linear(seconds)
+
+
+@benchmark
+@pytest.mark.parametrize("output_format,stream", BENCHMARK_FORMATS)
+def test_end_to_end_benchmark(
+    configs, make_config, record_property, output_format, stream
+):
+    seconds = {}
+    for rules in BENCHMARK_SCALES:
+        path = configs(rules)
+        argv = ["-F", output_format, path]
+        if stream:
+            argv.insert(0, "--stream")
+        config = make_config(*argv, plugins=PLUGINS)
+        result = timed(lambda: process_file(config, path), rounds=1)
+        record_property(f"convert {rules} rules", result)
+        seconds[rules] = result["min"]
+
+    assert_linear(seconds)
@@ -0,0 +1,216 @@
+"""Test report cache."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import json
+import os
+import pickle
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from netgate_xml_to_xlsx import batch
+from netgate_xml_to_xlsx import cache as cache_module
+from netgate_xml_to_xlsx.batch import process_file
+from netgate_xml_to_xlsx.cache import ResultCache
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.pfsense import PfSense
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+config_xml = """\
+<pfsense>
+    <system><hostname>fw</hostname><domain>example.com</domain></system>
+    <aliases>
+        <alias>
+            <name>host1</name>
+            <type>host</type>
+            <address>10.0.0.1</address>
+        </alias>
+    </aliases>
+</pfsense>
+"""
+
+
+@pytest.fixture
+def cached_config(tmp_path, make_config) -> Callable[..., dict]:
+    """Return a function building a configuration caching reports in tmp_path."""
+
+    def make(*argv: str | Path) -> dict:
+        options = ["-o", tmp_path / "output", "--cache-dir", tmp_path / "cache"]
+        return make_config(*options, *argv, plugins=["aliases", "system"])
+
+    return make
+
+
+def test_cache_hit_skips_conversion(tmp_path, monkeypatch, cached_config):
+    custom_log_level()
+    in_file = tmp_path / "fw-sanitized.xml"
+    in_file.write_text(config_xml, encoding="utf-8")
+    config = cached_config(in_file)
+    process_file(config, in_file)
+    report = tmp_path / "output" / "fw-sanitized.xml.REPORT.txt"
+    expected = report.read_text(encoding="utf-8")
+    report.unlink()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Cached file was converted.")
+
+    monkeypatch.setattr(batch, "PfSense", fail)
+    process_file(config, in_file)
+
+    assert report.read_text(encoding="utf-8") == expected
+
+
+def test_cache_keeps_file_names(tmp_path, cached_config):
+    custom_log_level()
+    in_files = [tmp_path / "day1-sanitized.xml", tmp_path / "day2-sanitized.xml"]
+    for in_file in in_files:
+        in_file.write_text(config_xml, encoding="utf-8")
+    config = cached_config("-F", "jsonl,sqlite", *in_files)
+    for in_file in in_files:
+        process_file(config, in_file)
+
+    output_dir = tmp_path / "output"
+    for name in ("day1-sanitized.xml", "day2-sanitized.xml"):
+        jsonl = output_dir / f"{name}.REPORT.jsonl"
+        first = json.loads(jsonl.read_text(encoding="utf-8").splitlines()[0])
+        assert first["file"] == name
+        with closing(sqlite3.connect(output_dir / f"{name}.REPORT.sqlite")) as db:
+            assert db.execute("select distinct firewall from aliases").fetchall() == [
+                (name,)
+            ]
+
+
+def test_cache_key(tmp_path, cached_config):
+    in_file = tmp_path / "fw-sanitized.xml"
+    in_file.write_text(config_xml, encoding="utf-8")
+    cache = ResultCache(tmp_path / "cache", 1024)
+    key = cache.key(cached_config(in_file), in_file, "txt")
+
+    assert cache.key(cached_config(in_file), in_file, "txt") == key
+    assert cache.key(cached_config(in_file), in_file, "xlsx") != key
+
+    # Formats recording the file name are keyed by it.
+    copy = tmp_path / "copy-sanitized.xml"
+    copy.write_text(config_xml, encoding="utf-8")
+    assert cache.key(cached_config(in_file), copy, "txt") == key
+    jsonl_key = cache.key(cached_config(in_file), in_file, "jsonl")
+    assert cache.key(cached_config(in_file), copy, "jsonl") != jsonl_key
+
+    config = cached_config(in_file)
+    config["plugins"] = ["aliases", "filter"]
+    assert cache.key(config, in_file, "txt") != key
+
+    in_file.write_text(config_xml.replace("host1", "host2"), encoding="utf-8")
+    assert cache.key(cached_config(in_file), in_file, "txt") != key
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    report = tmp_path / "report.txt"
+    report.write_text("x" * 100, encoding="utf-8")
+    cache = ResultCache(tmp_path / "cache", 250)
+
+    for age, key in enumerate(("a", "b")):
+        cache.put(key, report)
+        os.utime(cache.cache_dir / key, (1000 + age, 1000 + age))
+    assert cache.get("a", tmp_path / "a.txt")
+    cache.put("c", report)
+    cache.evict()
+
+    assert sorted(x.name for x in cache.cache_dir.iterdir()) == ["a", "c"]
+    assert not cache.get("b", tmp_path / "b.txt")
+
+
+def test_only_changed_sections_rerun(tmp_path, monkeypatch, cached_config):
+    custom_log_level()
+    in_file = tmp_path / "fw-sanitized.xml"
+    in_file.write_text(config_xml, encoding="utf-8")
+    config = cached_config(in_file)
+    process_file(config, in_file)
+
+    runs = []
+    plugin_sheets = PfSense.plugin_sheets
+
+    def counting_plugin_sheets(self, plugin_name):
+        runs.append(plugin_name)
+        return plugin_sheets(self, plugin_name)
+
+    monkeypatch.setattr(PfSense, "plugin_sheets", counting_plugin_sheets)
+    in_file.write_text(config_xml.replace("host1", "host2"), encoding="utf-8")
+    process_file(config, in_file)
+    cached = (tmp_path / "output" / "fw-sanitized.xml.REPORT.txt").read_text()
+
+    config["args"].cache_dir = None
+    process_file(config, in_file)
+    uncached = (tmp_path / "output" / "fw-sanitized.xml.REPORT.txt").read_text()
+
+    assert runs == ["aliases", "aliases", "system"]
+    assert "Aliases: name: host2\n" in cached
+    assert cached.split("Runtime")[0] == uncached.split("Runtime")[0]
+
+
+def test_sheets_stored_as_json(tmp_path):
+    cache = ResultCache(tmp_path / "cache", 1024)
+    sheet_data = SheetData(
+        sheet_name="Aliases",
+        header_row=["name", "descr"],
+        data_rows=[["a", "Host A"], ("b", "Host B")],
+        column_widths=[10, 40],
+        ok_to_rotate=False,
+    )
+    cache.put_sheets("key.sheets", [sheet_data])
+
+    text = (cache.cache_dir / "key.sheets").read_text(encoding="utf-8")
+    loaded = cache.get_sheets("key.sheets")
+
+    assert json.loads(text)[0]["sheet_name"] == "Aliases"
+    assert [x.sheet_name for x in loaded] == ["Aliases"]
+    assert loaded[0].header_row == ["name", "descr"]
+    assert loaded[0].data_rows == [["a", "Host A"], ["b", "Host B"]]
+    assert loaded[0].column_widths == [10, 40]
+    assert not loaded[0].ok_to_rotate
+
+
+def test_uncacheable_sheets_skipped(tmp_path):
+    cache = ResultCache(tmp_path / "cache", 1024)
+    sheet_data = SheetData(sheet_name="Bad", header_row=["a"], data_rows=[[object()]])
+
+    cache.put_sheets("key.sheets", [sheet_data])
+
+    assert cache.get_sheets("key.sheets") is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    (
+        "\x80\x04not json",
+        "{}",
+        '[{"sheet_name": "Aliases", "unknown": 1}]',
+    ),
+)
+def test_unreadable_sheets_are_a_miss(tmp_path, text):
+    cache = ResultCache(tmp_path / "cache", 1024)
+    (cache.cache_dir / "key.sheets").write_text(text, encoding="utf-8")
+
+    assert cache.get_sheets("key.sheets") is None
+
+
+def test_pickled_sheets_are_a_miss(tmp_path):
+    # Entries written before sheets were stored as JSON.
+    cache = ResultCache(tmp_path / "cache", 1024)
+    (cache.cache_dir / "key.sheets").write_bytes(pickle.dumps([{"sheet": "\xff"}]))
+
+    assert cache.get_sheets("key.sheets") is None
+
+
+def test_sheets_key_schema(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "cache", 1024)
+    key = cache.sheets_key("aliases", {"aliases"}, {})
+
+    monkeypatch.setattr(
+        "netgate_xml_to_xlsx.cache.SHEETS_SCHEMA", cache_module.SHEETS_SCHEMA + 1
+    )
+
+    assert cache.sheets_key("aliases", {"aliases"}, {}) != key
@@ -0,0 +1,89 @@
+"""Test structural configuration diff."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from typing import Callable
+
+from netgate_xml_to_xlsx.diff import ConfigDiff, diff_sheet
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+config_xml = """\
+<pfsense>
+    <system><hostname>fw</hostname><domain>example.com</domain></system>
+    <aliases>
+        <alias>
+            <name>host1</name>
+            <type>host</type>
+            <address>10.0.0.1</address>
+        </alias>
+        <alias>
+            <name>host2</name>
+            <type>host</type>
+            <address>10.0.0.2</address>
+        </alias>
+    </aliases>
+</pfsense>
+"""
+
+
+def make_diff(
+    make_config: Callable[..., dict], tmp_path, old_xml: str, new_xml: str
+) -> ConfigDiff:
+    custom_log_level()
+    old_path = tmp_path / "old-sanitized.xml"
+    new_path = tmp_path / "new-sanitized.xml"
+    old_path.write_text(old_xml, encoding="utf-8")
+    new_path.write_text(new_xml, encoding="utf-8")
+    config = make_config("diff", old_path, new_path)
+    return ConfigDiff(config, old_path, new_path)
+
+
+def test_diff_sheet():
+    header_row = ["name", "address", "descr"]
+    old = SheetData(
+        sheet_name="Aliases",
+        header_row=header_row,
+        data_rows=[["a", "10.0.0.1", ""], ["b", "10.0.0.2", "B"]],
+    )
+    new = SheetData(
+        sheet_name="Aliases",
+        header_row=header_row,
+        data_rows=[["b", "10.0.0.3", "B"], ["c", "10.0.0.4", ""]],
+    )
+
+    assert diff_sheet("Aliases", old, new).data_rows == [
+        ["removed", "a", "name", "a", ""],
+        ["removed", "a", "address", "10.0.0.1", ""],
+        ["changed", "b", "address", "10.0.0.2", "10.0.0.3"],
+        ["added", "c", "name", "", "c"],
+        ["added", "c", "address", "", "10.0.0.4"],
+    ]
+
+
+def test_diff_runs_changed_sections_only(tmp_path, make_config):
+    new_xml = config_xml.replace("10.0.0.2", "10.0.0.3").replace(
+        "<address>10.0.0.1</address>", "<address>10.0.0.1</address>\n<descr>x</descr>"
+    )
+    config_diff = make_diff(make_config, tmp_path, config_xml, new_xml)
+    sheets = config_diff.run(["system", "aliases"])
+
+    assert config_diff.changed_sections() == {"aliases"}
+    assert [x.sheet_name for x in sheets] == ["Summary", "Aliases"]
+    assert sheets[0].data_rows == [["Aliases", "0", "0", "2"]]
+    assert sheets[1].data_rows == [
+        ["changed", "host1", "descr", "", "x"],
+        ["changed", "host2", "address", "10.0.0.2", "10.0.0.3"],
+    ]
+
+
+def test_no_differences(tmp_path, make_config):
+    config_diff = make_diff(
+        make_config, tmp_path, config_xml, config_xml.replace("  ", "\t")
+    )
+    config_diff.write(["system", "aliases"])
+
+    text = config_diff.output_path.read_text(encoding="utf-8")
+    assert config_diff.output_path.name == (
+        "old-sanitized.xml--new-sanitized.xml.DIFF.txt"
+    )
+    assert text.startswith("Summary: sheet: No differences.\n")
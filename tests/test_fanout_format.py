@@ -0,0 +1,134 @@
+"""Test writing several output formats from a single pass."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import gzip
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from netgate_xml_to_xlsx.formats import create_format
+from netgate_xml_to_xlsx.formats.base_format import BaseFormat
+from netgate_xml_to_xlsx.formats.fanout import FanoutFormat
+from netgate_xml_to_xlsx.formats.xlsx import XlsxFormat
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.pfsense import PfSense
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+from .synthetic import write_config
+
+
+def system_sheet() -> SheetData:
+    return SheetData(
+        sheet_name="System",
+        header_row=["hostname", "domain"],
+        data_rows=[["fw", "example.com"]],
+    )
+
+
+class FailingFormat(BaseFormat):
+    def start(self) -> None:
+        pass
+
+    def out(self, sheet_data: SheetData) -> None:
+        raise ValueError("Cannot write.")
+
+    def finish(self) -> None:
+        pass
+
+
+def test_rotate_rows_does_not_modify_sheet():
+    sheet_data = system_sheet()
+    rotated = XlsxFormat({"output_path": None}).rotate_rows(sheet_data)
+
+    assert list(rotated.data_rows) == [("hostname", "fw"), ("domain", "example.com")]
+    assert sheet_data.header_row == ["hostname", "domain"]
+    assert sheet_data.data_rows == [["fw", "example.com"]]
+
+
+@pytest.mark.parametrize("writer_threads", (False, True))
+def test_fanout(tmp_path, writer_threads):
+    output_paths = {
+        "xlsx": tmp_path / "fw.xlsx",
+        "txt": tmp_path / "fw.txt.gz",
+        "jsonl": tmp_path / "fw.jsonl.gz",
+    }
+    output_format = create_format(
+        output_paths, ctx={"compress": "gzip"}, writer_threads=writer_threads
+    )
+    output_format.start()
+    output_format.out(system_sheet())
+    output_format.finish()
+
+    # Compression only applies to the text formats.
+    workbook = load_workbook(output_paths["xlsx"])
+    assert list(workbook["System"].values)[1] == ("hostname", "fw")
+    # The text formats see the original rows, not the xlsx rotation.
+    with gzip.open(output_paths["txt"], "rt", encoding="utf-8") as fh:
+        assert fh.read().startswith(
+            "System: hostname: fw\nSystem: domain: example.com\n"
+        )
+    with gzip.open(output_paths["jsonl"], "rt", encoding="utf-8") as fh:
+        assert json.loads(fh.readline())["data"] == {
+            "hostname": "fw",
+            "domain": "example.com",
+        }
+
+
+@pytest.mark.parametrize("threaded", (False, True))
+def test_fanout_error(threaded):
+    output_format = FanoutFormat([FailingFormat({})], threaded=threaded)
+    output_format.start()
+
+    with pytest.raises(ValueError, match="Cannot write"):
+        for _ in range(20):
+            output_format.out(system_sheet())
+        output_format.finish()
+
+
+@pytest.mark.parametrize("threaded", (False, True))
+def test_fanout_error_finishes_other_formats(tmp_path, threaded):
+    text_path = tmp_path / "fw.txt"
+    text_format = create_format({"txt": text_path}, ctx={})
+    output_format = FanoutFormat([text_format, FailingFormat({})], threaded=threaded)
+    output_format.start()
+
+    with pytest.raises(ValueError, match="Cannot write"):
+        try:
+            for _ in range(20):
+                output_format.out(system_sheet())
+        finally:
+            output_format.finish()
+
+    assert output_format.threads == []
+    assert text_path.read_text(encoding="utf-8").startswith("System: hostname: fw\n")
+    assert "Runtime: " in text_path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("writer_threads", (False, True))
+def test_plugin_error_finishes_output(
+    tmp_path, monkeypatch, make_config, writer_threads
+):
+    custom_log_level()
+    in_file = write_config(tmp_path / "fw-sanitized.xml", 5)
+    argv = ["-F", "txt,xlsx", in_file]
+    if writer_threads:
+        argv.insert(0, "--writer-threads")
+    config = make_config(*argv, plugins=["system", "aliases"])
+    pfsense = PfSense(config, in_file)
+    plugin_sheets = PfSense.plugin_sheets
+
+    def fail(self, plugin_name):
+        if plugin_name == "aliases":
+            raise ValueError("Plugin failed.")
+        return plugin_sheets(self, plugin_name)
+
+    monkeypatch.setattr(PfSense, "plugin_sheets", fail)
+    with pytest.raises(ValueError, match="Plugin failed"):
+        pfsense.run_all_plugins(["system", "aliases"])
+
+    # Sheets written before the error are saved.
+    text = pfsense.output_paths["txt"].read_text(encoding="utf-8")
+    assert text.startswith("System: ")
+    assert "Runtime: " in text
+    assert load_workbook(pfsense.output_paths["xlsx"]).sheetnames == ["System"]
@@ -0,0 +1,119 @@
+"""Test consolidated fleet report."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from typing import Callable
+
+import pytest
+from openpyxl import load_workbook
+
+from netgate_xml_to_xlsx.fleet import FleetReport, column_positions, run_fleet
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+config_xml = """\
+<pfsense>
+    <system><hostname>{hostname}</hostname><domain>example.com</domain></system>
+    <aliases>
+        <alias>
+            <name>host1</name>
+            <type>host</type>
+            <address>10.0.0.1</address>
+        </alias>
+    </aliases>
+</pfsense>
+"""
+
+
+def write_files(tmp_path) -> list:
+    in_files = []
+    for hostname in ("fw1", "fw2"):
+        in_file = tmp_path / f"{hostname}-sanitized.xml"
+        in_file.write_text(config_xml.format(hostname=hostname), encoding="utf-8")
+        in_files.append(in_file)
+    return in_files
+
+
+@pytest.fixture
+def fleet_config(tmp_path, make_config) -> Callable[..., dict]:
+    """Return a function building a fleet configuration for two input files."""
+
+    def make(*argv: str) -> dict:
+        options = ["-o", tmp_path / "output", "--fleet", "fleet"]
+        in_files = write_files(tmp_path)
+        return make_config(*options, *argv, *in_files, plugins=["system", "aliases"])
+
+    return make
+
+
+def test_column_positions():
+    columns = ["name", "address"]
+
+    assert column_positions(columns, ["address", "descr", "name", "descr"]) == [
+        1,
+        2,
+        0,
+        3,
+    ]
+    assert columns == ["name", "address", "descr", "descr"]
+
+
+def test_mismatched_headers(tmp_path, fleet_config):
+    fleet = FleetReport(fleet_config())
+    fleet.add(
+        "fw1",
+        [SheetData(sheet_name="Aliases", header_row=["name"], data_rows=[["a"]])],
+    )
+    fleet.add(
+        "fw2",
+        [
+            SheetData(
+                sheet_name="Aliases",
+                header_row=["descr", "name"],
+                data_rows=[["B", "b"], ["C", "c"]],
+            )
+        ],
+    )
+    sheet_data = fleet.sheets["Aliases"].sheet_data()
+
+    assert sheet_data.header_row == ["firewall", "name", "descr"]
+    assert len(sheet_data.data_rows) == 3
+    assert list(sheet_data.data_rows) == [
+        ["fw1", "a", ""],
+        ["fw2", "b", "B"],
+        ["fw2", "c", "C"],
+    ]
+
+    fleet.write()
+    assert not any(
+        x.name.startswith(".fleet-") for x in (tmp_path / "output").iterdir()
+    )
+
+
+@pytest.mark.parametrize("stream", (False, True))
+def test_fleet_txt(tmp_path, fleet_config, stream):
+    custom_log_level()
+    config = fleet_config("--stream") if stream else fleet_config()
+    run_fleet(config, config["args"].in_files)
+
+    text = (tmp_path / "output" / "fleet.FLEET.txt").read_text(encoding="utf-8")
+    fw1, fw2 = text.split("System: firewall: ")[1:3]
+    assert fw1.startswith("fw1-sanitized.xml\n")
+    assert "System: hostname: fw1\n" in fw1
+    assert fw2.startswith("fw2-sanitized.xml\n")
+    assert "System: hostname: fw2\n" in fw2
+    assert text.count("Aliases: name: host1\n") == 2
+
+
+def test_fleet_xlsx(tmp_path, fleet_config):
+    custom_log_level()
+    config = fleet_config("-F", "xlsx")
+    run_fleet(config, config["args"].in_files)
+
+    workbook = load_workbook(tmp_path / "output" / "fleet.FLEET.xlsx")
+    assert workbook.sheetnames == ["System", "Aliases"]
+    rows = list(workbook["Aliases"].values)
+    assert rows[0][:2] == ("firewall", "name")
+    assert [x[:2] for x in rows[1:3]] == [
+        ("fw1-sanitized.xml", "host1"),
+        ("fw2-sanitized.xml", "host1"),
+    ]
@@ -0,0 +1,57 @@
+"""Test JSON Lines output format."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import gzip
+import json
+
+from netgate_xml_to_xlsx.formats.jsonl import JsonlFormat
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+expected = [
+    {"file": "fw.xml", "sheet": "Rules", "data": {"name": "a", "descr": "Rule A"}},
+    {"file": "fw.xml", "sheet": "Rules", "data": {"name": "b", "descr": "Rule B"}},
+    {"file": "fw.xml", "sheet": "Dup", "data": {"descr": "x", "descr_2": "y"}},
+]
+
+
+def write(tmp_path, **ctx) -> None:
+    jsonl = JsonlFormat(
+        {"input_path": tmp_path / "fw.xml", "output_path": tmp_path / "fw.jsonl", **ctx}
+    )
+    jsonl.start()
+    jsonl.out(
+        SheetData(
+            sheet_name="Rules",
+            header_row=["name", "descr"],
+            data_rows=[["a", "Rule A"], ["b", "Rule B"]],
+        )
+    )
+    jsonl.out(SheetData(sheet_name="Empty", header_row=["name"], data_rows=[]))
+    jsonl.out(
+        SheetData(
+            sheet_name="Dup", header_row=["descr", "descr"], data_rows=[["x", "y"]]
+        )
+    )
+    jsonl.finish()
+
+
+def test_jsonl_output(tmp_path):
+    write(tmp_path, flush_rows=1)
+
+    lines = (tmp_path / "fw.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(x) for x in lines] == expected
+
+
+def test_jsonl_gzip(tmp_path):
+    write(tmp_path, compress="gzip")
+
+    with gzip.open(tmp_path / "fw.jsonl", "rt", encoding="utf-8") as fh:
+        assert [json.loads(x) for x in fh] == expected
+
+
+def test_jsonl_stdout(tmp_path, capsys):
+    write(tmp_path, stdout=True)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(x) for x in lines] == expected
+    assert not (tmp_path / "fw.jsonl").exists()
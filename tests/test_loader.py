@@ -0,0 +1,62 @@
+"""Test XML loading."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import pytest
+
+from netgate_xml_to_xlsx.errors import ScriptError
+from netgate_xml_to_xlsx.loader import PARSER_DEFAULTS, load_xml, parser_options
+
+from .benchmarks import BENCHMARK_MB, benchmark, measure
+from .synthetic import rules_for_mb, write_config
+
+# Measure loading as a string or from the file.
+measure_code = """\
+import json, resource, sys, time
+from pathlib import Path
+from lxml import etree
+from netgate_xml_to_xlsx.loader import load_xml
+
+path = Path(sys.argv[2])
+start = time.perf_counter()
+if sys.argv[1] == "str":
+    root = etree.XML(path.read_text(encoding="utf-8"))
+else:
+    root = load_xml(path)
+elapsed = time.perf_counter() - start
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rules = len(root.find("filter"))
+print(json.dumps({"seconds": elapsed, "peak_mb": peak_kb / 1024, "rules": rules}))
+"""
+
+
+def test_load_xml(tmp_path):
+    path = write_config(tmp_path / "fw.xml", 10)
+
+    root = load_xml(path)
+
+    rules = root.find("filter")
+    assert len(rules) == 10
+    assert rules[0].findtext("descr") == "Rule 0 ÅÉÎ"
+    assert rules[0].text.isspace()
+
+
+def test_parser_options():
+    assert parser_options({}) == PARSER_DEFAULTS
+    assert parser_options({"parser": {"huge_tree": True}})["huge_tree"]
+
+    with pytest.raises(ScriptError):
+        parser_options({"parser": {"recover": True}})
+
+
+@benchmark
+def test_load_benchmark(tmp_path, record_property):
+    count = rules_for_mb(BENCHMARK_MB)
+    path = write_config(tmp_path / "fw.xml", count)
+
+    by_str = measure(measure_code, "str", path)
+    by_file = measure(measure_code, "file", path)
+    record_property("str", by_str)
+    record_property("file", by_file)
+
+    assert by_str["rules"] == by_file["rules"] == count
+    assert by_file["peak_mb"] < by_str["peak_mb"]
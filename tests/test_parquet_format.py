@@ -0,0 +1,47 @@
+"""Test Parquet output format."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import sys
+
+import pytest
+
+from netgate_xml_to_xlsx.errors import ScriptError
+from netgate_xml_to_xlsx.formats.parquet import ParquetFormat
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+
+def test_parquet_output(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output_path = tmp_path / "fw.xml.REPORT.parquet"
+    output_path.mkdir()
+    (output_path / "stale.parquet").write_text("previous report", encoding="utf-8")
+
+    parquet = ParquetFormat(
+        {"input_path": tmp_path / "fw.xml", "output_path": output_path}
+    )
+    parquet.start()
+    parquet.out(
+        SheetData(
+            sheet_name="Filter Rules",
+            header_row=["tracker", "interface", "descr"],
+            data_rows=[["1", "lan", "Rule A"], ["2", "lan"]],
+        )
+    )
+    parquet.out(SheetData(sheet_name="Empty", header_row=["name"], data_rows=[]))
+    parquet.finish()
+
+    assert sorted(x.name for x in output_path.iterdir()) == ["filter_rules.parquet"]
+    table = pq.read_table(output_path / "filter_rules.parquet")
+    assert table.column_names == ["firewall", "tracker", "interface", "descr"]
+    assert table.schema.field("interface").type.value_type == "string"
+    assert table.to_pylist() == [
+        {"firewall": "fw.xml", "tracker": "1", "interface": "lan", "descr": "Rule A"},
+        {"firewall": "fw.xml", "tracker": "2", "interface": "lan", "descr": ""},
+    ]
+
+
+def test_pyarrow_missing(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ScriptError, match="pyarrow"):
+        ParquetFormat({"output_path": tmp_path / "fw.xml.REPORT.parquet"})
@@ -0,0 +1,60 @@
+"""Test command line parsing."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from pathlib import Path
+
+import pytest
+
+from netgate_xml_to_xlsx.parse_args import parse_args
+
+
+@pytest.fixture
+def in_file(tmp_path, monkeypatch) -> str:
+    monkeypatch.chdir(tmp_path)
+    Path("fw.xml").write_text("<pfsense/>", encoding="utf-8")
+    Path("fw-sanitized.xml").write_text("<pfsense/>", encoding="utf-8")
+    return "fw-sanitized.xml"
+
+
+@pytest.mark.parametrize("command", ([], ["convert"]))
+def test_convert_default(in_file, command):
+    args = parse_args([*command, "-F", "txt,xlsx", in_file])
+
+    assert args.command == "convert"
+    assert args.in_files == [Path(in_file)]
+    assert args.output_format == ["txt", "xlsx"]
+    assert args.output_dir == Path("output")
+
+
+def test_diff(in_file):
+    args = parse_args(["diff", "-o", "diffs", "-F", "xlsx", in_file, in_file])
+
+    assert args.command == "diff"
+    assert (args.old_file, args.new_file) == (Path(in_file), Path(in_file))
+    assert args.output_format == "xlsx"
+    assert args.output_dir == Path("diffs")
+
+
+@pytest.mark.parametrize(
+    "argv",
+    (
+        ["diff", "-F", "txt,xlsx", "fw-sanitized.xml", "fw-sanitized.xml"],
+        ["diff", "-F", "sqlite", "fw-sanitized.xml", "fw-sanitized.xml"],
+        ["diff", "fw.xml", "fw-sanitized.xml"],
+        ["--sanitize", "--stats", "fw.xml"],
+        ["--profile-plugins", "filter,filtr", "fw-sanitized.xml"],
+        ["--fleet", "fleet", "--jobs", "2", "fw-sanitized.xml"],
+        ["--fleet", "fleet", "--cache-dir", "cache", "fw-sanitized.xml"],
+    ),
+)
+def test_rejected(in_file, capsys, argv):
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+    assert capsys.readouterr().out.startswith("Error: ")
+
+
+def test_profile_plugins(in_file):
+    args = parse_args(["--profile-plugins", "filter,aliases", in_file])
+
+    assert args.profile_plugins == ["filter", "aliases"]
@@ -0,0 +1,58 @@
+"""Test base plugin row loading."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import logging
+
+import pytest
+from lxml import etree
+
+from netgate_xml_to_xlsx.errors import NodeError
+from netgate_xml_to_xlsx.plugins.base_plugin import BasePlugin
+
+xml = """\
+<rule>
+    <name>rule1</name>
+    <!-- comment -->
+    <descr>Rule &amp; one</descr>
+    <extra>1</extra>
+    <source><address>10.0.0.1</address></source>
+</rule>
+"""
+
+
+class LocalPlugin(BasePlugin):
+    def run(self, pfsense):
+        pass
+
+
+def test_load_row(caplog):
+    plugin = LocalPlugin("name", "name,descr,source,missing")
+
+    row = plugin.load_row(etree.XML(xml))
+
+    assert row == ["rule1", "Rule & one", "10.0.0.1", ""]
+    assert "unknown child node(s): extra" in caplog.text
+
+
+def test_load_row_node_names(caplog):
+    caplog.set_level(logging.WARNING)
+    plugin = LocalPlugin("name", "")
+
+    row = plugin.load_row(etree.XML(xml), "extra,name,source,descr".split(","))
+
+    assert row == ["1", "rule1", "10.0.0.1", "Rule & one"]
+    assert caplog.text == ""
+
+
+def test_load_row_missing_node():
+    plugin = LocalPlugin("name", "name,descr")
+
+    assert plugin.load_row(None) == ["", ""]
+    assert plugin.load_row(None, ["name"]) == [""]
+
+
+def test_load_row_duplicate():
+    plugin = LocalPlugin("name", "name")
+
+    with pytest.raises(NodeError, match="more than one result for: name"):
+        plugin.load_row(etree.XML("<rule><name>a</name><name>b</name></rule>"))
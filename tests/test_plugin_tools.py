@@ -0,0 +1,72 @@
+"""Test plugin discovery."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from lxml import etree
+
+from netgate_xml_to_xlsx.plugin_tools import (
+    PluginRegistry,
+    discover_plugins,
+    index_nodes,
+    plugins_to_run,
+)
+
+ipsec_xml = """\
+<pfsense>
+    <ipsec>
+        <async_crypto>disabled</async_crypto>
+        <logging></logging>
+        <uniqueids>yes</uniqueids>
+        <vtimaps></vtimaps>
+        <filtermode>enc</filtermode>
+        <bypassrules></bypassrules>
+        <phase1>
+            <descr>Phase 1</descr>
+        </phase1>
+        <phase2>
+            <descr>Phase 2</descr>
+        </phase2>
+    </ipsec>
+</pfsense>
+"""
+
+
+def test_discover_plugins_once():
+    assert discover_plugins() is discover_plugins()
+    assert "aliases" in discover_plugins()
+
+
+def test_plugin_reuse():
+    """Running a plugin must not change the output of the next run."""
+    parsed_xml = etree.XML(ipsec_xml)
+    plugin = discover_plugins()["ipsec"]
+
+    first = [(x.sheet_name, x.header_row) for x in plugin.run(parsed_xml)]
+    second = [(x.sheet_name, x.header_row) for x in plugin.run(parsed_xml)]
+
+    assert [x[0] for x in first] == ["IPSEC", "IPSEC Phase 1", "IPSEC Phase 2"]
+    assert first == second
+
+
+def test_registry_imports_on_demand():
+    registry = PluginRegistry()
+    assert "installed_haproxy" in registry
+    assert not registry.plugins
+
+    plugin = registry["installed_haproxy"]
+
+    assert list(registry.plugins) == ["installed_haproxy"]
+    assert registry["installed_haproxy"] is plugin
+    assert registry.load("installed_haproxy") is plugin
+
+
+def test_plugins_to_run():
+    parsed_xml = etree.XML(
+        "<pfsense><aliases/><installedpackages><haproxy/></installedpackages></pfsense>"
+    )
+    node_index = index_nodes(parsed_xml)
+    plugin_names = ["aliases", "filter", "installed_haproxy", "installed_squid", "x"]
+
+    result = plugins_to_run(plugin_names, node_index)
+
+    assert node_index == {"aliases", "installedpackages", "installedpackages,haproxy"}
+    assert result == ["aliases", "installed_haproxy", "x"]
@@ -0,0 +1,99 @@
+"""Test profiling."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import cProfile
+import logging
+import pstats
+
+from netgate_xml_to_xlsx.batch import process_file
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.profiler import collapsed_stacks, frame_label, profiled
+
+from .synthetic import write_config
+
+
+def inner() -> int:
+    return sum(x * x for x in range(20000))
+
+
+def outer() -> int:
+    return inner() + inner()
+
+
+def test_frame_label():
+    assert frame_label(("~", 0, "<built-in method builtins.sum>")) == (
+        "<built-in method builtins.sum>"
+    )
+    assert frame_label(("/src/a;b.py", 12, "run")) == "run (a:b.py:12)"
+
+
+def test_collapsed_stacks():
+    profile = cProfile.Profile()
+    profile.runcall(outer)
+
+    lines = collapsed_stacks(pstats.Stats(profile))
+
+    stacks = dict(x.rsplit(" ", 1) for x in lines)
+    inner_stacks = [x for x in stacks if x.split(";")[-1].startswith("inner (")]
+    assert len(inner_stacks) == 1
+    assert inner_stacks[0].split(";")[-2].startswith("outer (")
+    assert all(int(x) > 0 for x in stacks.values())
+
+    # Time below inner is attributed to the generator expression it sums.
+    genexpr = [x for x in stacks if x.startswith(inner_stacks[0] + ";")]
+    assert genexpr
+
+
+def test_profiled(tmp_path):
+    with profiled(tmp_path / "profile"):
+        outer()
+
+    assert pstats.Stats(str(tmp_path / "profile.pstats")).total_calls > 0
+    collapsed = (tmp_path / "profile.collapsed").read_text(encoding="utf-8")
+    assert ";inner (test_profiler.py:" in collapsed
+
+
+def test_profile_plugins(tmp_path, caplog, make_config):
+    custom_log_level()
+    caplog.set_level(logging.INFO)
+    in_file = write_config(tmp_path / "fw-sanitized.xml", 20)
+
+    config = make_config(
+        "--profile-plugins", "filter", in_file, plugins=["aliases", "filter"]
+    )
+    process_file(config, in_file)
+
+    log_dir = tmp_path / "logs"
+    assert sorted(x.name for x in log_dir.iterdir()) == [
+        "fw-sanitized.xml.filter.collapsed",
+        "fw-sanitized.xml.filter.pstats",
+    ]
+    collapsed = (log_dir / "fw-sanitized.xml.filter.collapsed").read_text(
+        encoding="utf-8"
+    )
+    assert "run (filter.py:" in collapsed
+    assert "aliases.py" not in collapsed
+    assert "Profile path:" in caplog.text
+
+
+def test_profile_plugins_run_one_at_a_time(tmp_path, monkeypatch, make_config):
+    custom_log_level()
+    in_file = write_config(tmp_path / "fw-sanitized.xml", 20)
+    config = make_config(
+        "--profile-plugins",
+        "filter,aliases",
+        "--plugin-workers",
+        "4",
+        in_file,
+        plugins=["aliases", "filter"],
+    )
+    pools = []
+    monkeypatch.setattr(
+        "netgate_xml_to_xlsx.pfsense.ThreadPoolExecutor",
+        lambda **kwargs: pools.append(kwargs),
+    )
+
+    process_file(config, in_file)
+
+    assert pools == []
+    assert len(list((tmp_path / "logs").glob("*.pstats"))) == 2
@@ -1,10 +1,33 @@
 """Test XML sanitizing."""
 # Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
 
+from collections import Counter
+
 import pytest
 
 from netgate_xml_to_xlsx.plugins.support.elements import sanitize_xml
 
+from .benchmarks import BENCHMARK_MB, assert_linear, benchmark, timed
+
+user_xml = """\
+        <user>
+            <name>user{i}</name>
+            <bcrypt-hash>$2y$10$abcdefghijklmnopqrstuv</bcrypt-hash>
+            <authorizedkeys>c3NoLXJzYSBBQUFBQjNOemFDMXljMkVBQUFBREFRQUJBQUFCQVFD</authorizedkeys>
+            <descr><![CDATA[User {i}]]></descr>
+        </user>
+"""
+
+
+def make_xml(size_mb: int) -> str:
+    """Return a document of approximately size_mb."""
+    block = "".join(user_xml.format(i=x) for x in range(1000))
+    return (
+        "<pfsense>\n"
+        + block * (size_mb * 1024 * 1024 // len(block) + 1)
+        + "</pfsense>\n"
+    )
+
 
 @pytest.mark.parametrize(
     "source,sanitized",
@@ -23,3 +46,34 @@ from netgate_xml_to_xlsx.plugins.support.elements import sanitize_xml
 def test_sanitize(source, sanitized):
     result = sanitize_xml(source)
     assert result == sanitized
+
+
+def test_sanitize_counts():
+    source = (
+        "<password>a</password><password>b</password>\n"
+        "<encryption_password>c</encryption_password><x>d</x>\n"
+        "<prv></prv><password>\n</password>"
+    )
+    counts: Counter = Counter()
+
+    result = sanitize_xml(source, counts)
+
+    assert result == (
+        "<password>SANITIZED</password><password>SANITIZED</password>\n"
+        "<encryption_password>SANITIZED</encryption_password><x>d</x>\n"
+        "<prv>SANITIZED</prv><password>\n</password>"
+    )
+    assert counts == {"password": 2, "encryption_password": 1, "prv": 1}
+
+
+@benchmark
+def test_sanitize_benchmark(record_property):
+    """Sanitize time per MB must not grow with input size."""
+    seconds = {}
+    for size_mb in (BENCHMARK_MB // 8, BENCHMARK_MB // 2, BENCHMARK_MB):
+        source = make_xml(size_mb)
+        result = timed(lambda: sanitize_xml(source), rounds=1)
+        record_property(f"{size_mb} MB", result)
+        seconds[size_mb] = result["min"]
+
+    assert_linear(seconds)
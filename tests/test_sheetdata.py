@@ -0,0 +1,82 @@
+"""Test SheetData."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import pytest
+
+from netgate_xml_to_xlsx.sheetdata import ColumnRows, RotatedRows, SheetData
+
+header_row = ["name", "type", "descr"]
+data_rows = [["a", "host", "Host A"], ["b", "network", "Network B"]]
+
+
+def test_defaults_not_shared():
+    first = SheetData()
+    first.header_row.append("name")
+    first.data_rows.append(["a"])
+    first.column_widths.append(10)
+
+    second = SheetData()
+
+    assert (second.header_row, second.data_rows, second.column_widths) == ([], [], [])
+
+
+def test_slots():
+    sheet_data = SheetData(sheet_name="Aliases")
+
+    assert not hasattr(sheet_data, "__dict__")
+    with pytest.raises(AttributeError):
+        sheet_data.sheet_nmae = "Typo"
+
+
+def test_header_interned():
+    first = SheetData(header_row=["".join(["de", "scr"])])
+    second = SheetData(header_row=["".join(["des", "cr"])])
+
+    assert first.header_row[0] is second.header_row[0]
+
+
+def test_column_rows():
+    rows = ColumnRows([list(x) for x in zip(*data_rows)])
+
+    assert len(rows) == 2
+    assert list(rows) == [tuple(x) for x in data_rows]
+    assert rows[1] == ("b", "network", "Network B")
+    assert rows[-1] == rows[1]
+    assert rows[:1] == [("a", "host", "Host A")]
+
+    with pytest.raises(ValueError):
+        ColumnRows([["a", "b"], ["host"]])
+
+
+@pytest.mark.parametrize("columnar", (False, True))
+def test_rotated(columnar):
+    if columnar:
+        sheet_data = SheetData.from_columns(
+            sheet_name="Aliases",
+            header_row=header_row,
+            columns=[list(x) for x in zip(*data_rows)],
+        )
+    else:
+        sheet_data = SheetData(
+            sheet_name="Aliases", header_row=header_row, data_rows=data_rows
+        )
+
+    rotated = sheet_data.rotated()
+
+    assert isinstance(rotated.data_rows, RotatedRows)
+    assert rotated.data_rows.data_rows is sheet_data.data_rows
+    assert rotated.header_row == ["name", "data", "data"]
+    assert rotated.column_widths == [60, 80, 80]
+    assert list(rotated.data_rows) == list(zip(header_row, *data_rows))
+    assert len(rotated.data_rows) == 3
+    assert rotated.data_rows[-1] == ("descr", "Host A", "Network B")
+    with pytest.raises(IndexError):
+        rotated.data_rows[3]
+
+
+def test_rotated_short_row():
+    sheet_data = SheetData(header_row=header_row, data_rows=[["a", "host"], ["b"]])
+
+    assert list(sheet_data.rotated().data_rows) == list(
+        zip(header_row, ["a", "host"], ["b"])
+    )
@@ -0,0 +1,50 @@
+"""Test SQLite output format."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import sqlite3
+
+from netgate_xml_to_xlsx.formats.sqlite import SqliteFormat, identifier
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+
+def test_identifier():
+    used: set[str] = set()
+
+    assert identifier("Filter Rules", used) == "filter_rules"
+    assert identifier("filter-rules", used) == "filter_rules_2"
+    assert identifier("1:1 NAT", used) == "_1_1_nat"
+    assert identifier("", used) == "column"
+
+
+def test_sqlite_output(tmp_path):
+    output_path = tmp_path / "fw.sqlite"
+    output_path.write_text("previous report", encoding="utf-8")
+    sqlite = SqliteFormat(
+        {"input_path": tmp_path / "fw.xml", "output_path": output_path}
+    )
+    sqlite.start()
+    sqlite.out(
+        SheetData(
+            sheet_name="Filter Rules",
+            header_row=["tracker", "Descr", "descr"],
+            data_rows=[["1", "Rule A", "x"], ["2", "Rule B"]],
+        )
+    )
+    sqlite.out(SheetData(sheet_name="Empty", header_row=["name"], data_rows=[]))
+    sqlite.finish()
+
+    connection = sqlite3.connect(output_path)
+    tables = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).fetchall()
+    indexes = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    ).fetchall()
+    rows = connection.execute(
+        "SELECT firewall, tracker, descr, descr_2 FROM filter_rules"
+    ).fetchall()
+    connection.close()
+
+    assert tables == [("filter_rules",)]
+    assert sorted(indexes) == [("filter_rules_firewall",), ("filter_rules_tracker",)]
+    assert rows == [("fw.xml", "1", "Rule A", "x"), ("fw.xml", "2", "Rule B", "")]
@@ -0,0 +1,60 @@
+"""Test command line start-up cost."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import subprocess  # nosec
+import sys
+
+import pytest
+
+# Cumulative import time budget for the entry point, in microseconds.
+# Generous to allow for slow CI machines, but well below the cost of
+# loading openpyxl and lxml.
+IMPORT_BUDGET_US = 500_000
+
+HEAVY_MODULES = ("lxml", "openpyxl", "toml", "netgate_xml_to_xlsx.plugins")
+
+
+def import_times(*args: str) -> dict[str, int]:
+    """
+    Run Python with -X importtime and return cumulative import time per module.
+
+    Args:
+        args: Arguments passed to python after `-X importtime`.
+
+    Returns:
+        Dictionary of module name: cumulative import time (microseconds).
+
+    """
+    result = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def heavy_imports(times: dict[str, int]) -> list[str]:
+    """Return heavy modules found in the import times."""
+    return [x for x in times if x.startswith(HEAVY_MODULES)]
+
+
+def test_entry_point_import_budget():
+    times = import_times("-c", "import netgate_xml_to_xlsx.main")
+
+    assert heavy_imports(times) == []
+    assert times["netgate_xml_to_xlsx"] < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize("option", ("--version", "--help"))
+def test_cli_fast_path(option):
+    code = "from netgate_xml_to_xlsx.main import main; main()"
+    times = import_times("-c", code, option)
+
+    assert "netgate_xml_to_xlsx.main" in times
+    assert heavy_imports(times) == []
@@ -0,0 +1,103 @@
+"""Test plugin statistics."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import json
+import logging
+import tracemalloc
+
+import pytest
+
+from netgate_xml_to_xlsx.batch import process_file
+from netgate_xml_to_xlsx.formats.text import TextFormat
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.pfsense import PfSense
+from netgate_xml_to_xlsx.sheetdata import SheetData
+from netgate_xml_to_xlsx.stats import Stats
+
+config_xml = """\
+<pfsense>
+    <system><hostname>fw</hostname><domain>example.com</domain></system>
+    <aliases>
+        <alias>
+            <name>host1</name>
+            <type>host</type>
+            <address>10.0.0.1</address>
+        </alias>
+        <alias>
+            <name>host2</name>
+            <type>host</type>
+            <address>10.0.0.2</address>
+        </alias>
+    </aliases>
+</pfsense>
+"""
+
+
+def test_plugin_stats():
+    def run():
+        data = [list(range(1000)) for _ in range(100)]
+        yield SheetData(sheet_name="One", header_row=["a"], data_rows=[["1"], ["2"]])
+        del data
+        yield SheetData(sheet_name="Two", header_row=["a"], data_rows=[["3"]])
+
+    stats = Stats()
+    sheets = list(stats.plugin("example", run))
+    with stats.output("example"):
+        pass
+    stats.close()
+
+    assert [x.sheet_name for x in sheets] == ["One", "Two"]
+    plugin_stats = stats.plugins["example"]
+    assert (plugin_stats.sheets, plugin_stats.rows) == (2, 3)
+    assert plugin_stats.peak_bytes > 100 * 1000 * 8
+    assert plugin_stats.wall_seconds > 0
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.parametrize("plugin_workers", (1, 2))
+def test_process_file_stats(tmp_path, caplog, make_config, plugin_workers):
+    custom_log_level()
+    caplog.set_level(logging.INFO)
+    in_file = tmp_path / "fw-sanitized.xml"
+    in_file.write_text(config_xml, encoding="utf-8")
+
+    config = make_config(
+        "--stats",
+        "--stats-json",
+        "--plugin-workers",
+        str(plugin_workers),
+        in_file,
+        plugins=["system", "aliases"],
+    )
+    process_file(config, in_file)
+
+    data = json.loads((tmp_path / "fw-sanitized.xml.STATS.json").read_text())
+    assert data["input"] == "fw-sanitized.xml"
+    plugins = {x["plugin"]: x for x in data["plugins"]}
+    assert set(plugins) == {"system", "aliases"}
+    assert (plugins["aliases"]["sheets"], plugins["aliases"]["rows"]) == (1, 2)
+    assert plugins["system"]["rows"] == 1
+
+    messages = [x.getMessage() for x in caplog.records]
+    header = next(i for i, x in enumerate(messages) if x.startswith("Plugin "))
+    assert messages[header + 3].startswith("Total ")
+
+
+def test_tracing_limited_to_plugins(tmp_path, monkeypatch, make_config):
+    custom_log_level()
+    in_file = tmp_path / "fw-sanitized.xml"
+    in_file.write_text(config_xml, encoding="utf-8")
+    config = make_config("--stats", in_file, plugins=["system", "aliases"])
+
+    pfsense = PfSense(config, in_file)
+    assert not tracemalloc.is_tracing()
+
+    def fail(self, sheet_data):
+        assert tracemalloc.is_tracing()
+        raise RuntimeError("Output failed.")
+
+    monkeypatch.setattr(TextFormat, "out", fail)
+    with pytest.raises(RuntimeError):
+        pfsense.run_all_plugins(config["plugins"])
+
+    assert not tracemalloc.is_tracing()
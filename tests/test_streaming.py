@@ -0,0 +1,171 @@
+"""Test streaming parse."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+from typing import Callable
+
+import pytest
+
+from netgate_xml_to_xlsx.logging import custom_log_level
+from netgate_xml_to_xlsx.pfsense import PfSense
+from netgate_xml_to_xlsx.streaming import iter_sections
+
+config_xml = """\
+<pfsense>
+    <version>22.2</version>
+    <lastchange></lastchange>
+    <cert><refid>b</refid><descr>Cert B</descr><type>server</type></cert>
+    <cert><refid>a</refid><descr>Cert A</descr><type>server</type></cert>
+    <rrd><enable/></rrd>
+    <aliases>
+        <alias>
+            <name>host1</name>
+            <type>host</type>
+            <address>10.0.0.1</address>
+        </alias>
+    </aliases>
+    <system><hostname>fw</hostname><domain>example.com</domain></system>
+    <installedpackages>
+        <package><name>unknown</name></package>
+        <unknownpkg/>
+    </installedpackages>
+</pfsense>
+"""
+
+plugins = [
+    "report_unknown_installedpackages",
+    "aliases",
+    "cert",
+    "filter",
+    "system",
+]
+
+
+def convert(
+    make_config: Callable[..., dict], tmp_path, stream: bool, plugin_workers: int = 1
+) -> list[str]:
+    custom_log_level()
+    in_file = tmp_path / "fw-sanitized.xml"
+    in_file.write_text(config_xml, encoding="utf-8")
+    output_dir = tmp_path / f"""{"stream" if stream else "tree"}{plugin_workers}"""
+    argv = ["-o", output_dir, "--plugin-workers", str(plugin_workers), in_file]
+    if stream:
+        argv.insert(0, "--stream")
+    pfsense = PfSense(make_config(*argv, plugins=plugins), in_file)
+    pfsense.run_all_plugins(plugins)
+
+    lines = pfsense.output_paths["txt"].read_text(encoding="utf-8").splitlines()
+    return [x for x in lines if not x.startswith("Runtime")]
+
+
+def test_iter_sections(tmp_path):
+    in_file = tmp_path / "fw.xml"
+    in_file.write_text(config_xml, encoding="utf-8")
+
+    events = [(x[0], x[2] is not None and x[2].tag) for x in iter_sections(in_file)]
+
+    assert events[:4] == [
+        ("start", "version"),
+        ("end", "version"),
+        ("start", "lastchange"),
+        ("end", "lastchange"),
+    ]
+    assert events[-1] == ("done", False)
+
+
+def test_stream_matches_tree(tmp_path, make_config):
+    tree = convert(make_config, tmp_path, stream=False)
+    stream = convert(make_config, tmp_path, stream=True)
+
+    assert stream == tree
+    assert any(x.startswith("Unknown Packages: ") for x in stream)
+    assert any(x.startswith("System: ") for x in stream)
+    assert any(x == "Aliases: name: host1" for x in stream)
+    assert stream.index("Certs: refid: a") < stream.index("Certs: refid: b")
+
+
+@pytest.mark.parametrize("stream", (False, True))
+def test_plugin_workers_keep_order(tmp_path, make_config, stream):
+    sequential = convert(make_config, tmp_path, stream=stream)
+    concurrent = convert(make_config, tmp_path, stream=stream, plugin_workers=4)
+
+    assert concurrent == sequential
+
+
+secret_xml = """\
+<pfsense>
+    <version>22.2</version>
+    <lastchange></lastchange>
+    <system>
+        <user>
+            <name>admin Å</name>
+            <bcrypt-hash>$2y$10$secret</bcrypt-hash>
+            <password></password>
+            <authorizedkeys>
+                multi-line key
+            </authorizedkeys>
+            <tls><a>secret</a> secret</tls>
+        </user>
+    </system>
+    <installedpackages>
+        <haproxy>
+            <advanced>secret</advanced>
+            <ha_backends/>
+        </haproxy>
+    </installedpackages>
+</pfsense>
+"""
+
+
+def sanitize(
+    make_config: Callable[..., dict], tmp_path, stream: bool, xml: str = secret_xml
+) -> str:
+    custom_log_level()
+    in_dir = tmp_path / ("stream" if stream else "tree")
+    in_dir.mkdir()
+    in_file = in_dir / "fw.xml"
+    in_file.write_text(xml, encoding="utf-8")
+    argv = ["--sanitize", "-o", in_dir, in_file]
+    if stream:
+        argv.insert(0, "--stream")
+    plugins = ["system", "installed_haproxy"]
+    PfSense(make_config(*argv, plugins=plugins), in_file).sanitize(plugins)
+
+    assert not in_file.exists()
+    return (in_dir / "fw-sanitized.xml").read_text(encoding="utf-8")
+
+
+def test_sanitize_stream_matches_tree(tmp_path, make_config):
+    tree = sanitize(make_config, tmp_path, stream=False)
+    stream = sanitize(make_config, tmp_path, stream=True)
+
+    assert stream == tree
+    assert "secret" not in stream
+    assert "<advanced>SANITIZED</advanced>" in stream
+    assert "<password>SANITIZED</password>" in stream
+    assert "<lastchange/>" in stream
+    assert "multi-line key" in stream
+
+
+@pytest.mark.parametrize(
+    "xml",
+    (
+        # Compact input is indented when written.
+        "".join(x.strip() for x in secret_xml.splitlines()),
+        # Sensitive top-level elements with children, and elements sanitize_xml skips.
+        """\
+<pfsense>
+    <version>22.2</version>
+    <tls><a>secret</a></tls>
+    <system><user><password/><password type="x">kept</password></user></system>
+    <installedpackages><haproxy><advanced>secret</advanced>\
+<ha_backends/></haproxy></installedpackages>
+</pfsense>
+""",
+    ),
+)
+def test_sanitize_stream_matches_tree_layout(tmp_path, make_config, xml):
+    tree = sanitize(make_config, tmp_path, stream=False, xml=xml)
+    stream = sanitize(make_config, tmp_path, stream=True, xml=xml)
+
+    assert stream == tree
+    assert "secret" not in stream
@@ -0,0 +1,82 @@
+"""Test text output format."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import gzip
+import sys
+
+import pytest
+
+from netgate_xml_to_xlsx.errors import ScriptError
+from netgate_xml_to_xlsx.formats.text import TextFormat
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+expected = """\
+Rules: name: a
+Rules: descr: Rule A; line 2
+--------------------
+
+Rules: name: b
+Rules: descr: Rule B
+--------------------
+
+Rules: name: c
+Rules: descr: Rule C
+--------------------
+
+====================
+
+"""
+
+
+def write(output_path, **ctx) -> None:
+    text = TextFormat({"output_path": output_path, **ctx})
+    text.start()
+    text.out(
+        SheetData(
+            sheet_name="Rules",
+            header_row=["name", "descr"],
+            data_rows=[["a", "Rule A\nline 2"], ["b", "Rule B"], ["c", "Rule C"]],
+        )
+    )
+    text.out(SheetData(sheet_name="Empty", header_row=["name"], data_rows=[]))
+    text.finish()
+
+
+def without_runtime(text: str) -> str:
+    return text[: text.index("Runtime: ")]
+
+
+@pytest.mark.parametrize("flush_rows", (0, 1, 2))
+def test_text_output(tmp_path, flush_rows):
+    output_path = tmp_path / "fw.txt"
+    write(output_path, flush_rows=flush_rows)
+
+    assert without_runtime(output_path.read_text(encoding="utf-8")) == expected
+
+
+def test_gzip_output(tmp_path):
+    output_path = tmp_path / "fw.txt.gz"
+    write(output_path, compress="gzip")
+
+    with gzip.open(output_path, "rt", encoding="utf-8") as fh:
+        assert without_runtime(fh.read()) == expected
+
+
+def test_zstd_output(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    output_path = tmp_path / "fw.txt.zst"
+    write(output_path, compress="zstd")
+
+    data = (
+        zstandard.ZstdDecompressor()
+        .decompressobj()
+        .decompress(output_path.read_bytes())
+    )
+    assert without_runtime(data.decode("utf-8")) == expected
+
+
+def test_zstd_missing(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    with pytest.raises(ScriptError, match="zstandard"):
+        write(tmp_path / "fw.txt.zst", compress="zstd")
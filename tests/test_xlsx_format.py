@@ -0,0 +1,108 @@
+"""Test XLSX output format."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+from netgate_xml_to_xlsx.formats.xlsx import XlsxFormat
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+from .benchmarks import benchmark, measure
+
+# NETGATE_BENCHMARK_RULES sets the benchmark rule count.
+BENCHMARK_RULES = int(os.environ.get("NETGATE_BENCHMARK_RULES", "50000"))
+
+# Write a rules sheet with either writer.
+measure_code = """\
+import json, resource, sys, time
+from pathlib import Path
+from netgate_xml_to_xlsx.formats.xlsx import XlsxFormat
+from netgate_xml_to_xlsx.sheetdata import SheetData
+
+stream, count, output_path = sys.argv[1] == "stream", int(sys.argv[2]), sys.argv[3]
+header = "tracker,type,interface,ipprotocol,protocol,source,destination,descr".split(",")
+rows = [
+    [str(x), "pass", "lan", "inet", "tcp", "lan", f"any:{x}", f"Rule {x}"]
+    for x in range(count)
+]
+sheet_data = SheetData(
+    sheet_name="Rules",
+    header_row=header,
+    data_rows=rows,
+    column_widths=[20] * len(header),
+    ok_to_rotate=False,
+)
+start = time.perf_counter()
+xlsx = XlsxFormat({"output_path": Path(output_path), "stream": stream})
+xlsx.start()
+xlsx.out(sheet_data)
+xlsx.finish()
+elapsed = time.perf_counter() - start
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "peak_mb": peak_kb / 1024}))
+"""
+
+
+def sheets(path) -> list:
+    """Return the name, column widths and (value, style) cells of each sheet."""
+    workbook = load_workbook(path)
+    result = []
+    for sheet in workbook:
+        widths = {k: v.width for k, v in sheet.column_dimensions.items()}
+        rows = [[(x.value, x.style) for x in row] for row in sheet.iter_rows()]
+        # Ignore the run date.
+        result.append((sheet.title, widths, rows[:-1], rows[-1][0][1]))
+    return result
+
+
+def write(path, stream: bool) -> None:
+    xlsx = XlsxFormat({"output_path": path, "stream": stream})
+    xlsx.start()
+    xlsx.out(
+        SheetData(
+            sheet_name="Rules",
+            header_row=["name", "descr"],
+            data_rows=[["a", "Rule A"], ["b", "Rule B"]],
+            column_widths=[10, 40],
+            ok_to_rotate=False,
+        )
+    )
+    xlsx.out(SheetData(sheet_name="Empty", header_row=["name"], data_rows=[]))
+    xlsx.out(
+        SheetData(
+            sheet_name="System",
+            header_row=["hostname", "domain"],
+            data_rows=[["fw", "example.com"]],
+        )
+    )
+    xlsx.finish()
+
+
+def test_write_only_matches_workbook(tmp_path):
+    write(tmp_path / "workbook.xlsx", stream=False)
+    write(tmp_path / "write_only.xlsx", stream=True)
+
+    workbook = sheets(tmp_path / "workbook.xlsx")
+    write_only = sheets(tmp_path / "write_only.xlsx")
+
+    assert write_only == workbook
+    assert [x[0] for x in write_only] == ["Rules", "System"]
+    assert write_only[0][2][0] == [("name", "header"), ("descr", "header")]
+    assert write_only[0][2][1] == [("a", "normal"), ("Rule A", "normal")]
+    assert write_only[0][3] == "footer"
+
+
+@benchmark
+def test_write_only_benchmark(tmp_path, record_property):
+    workbook = measure(
+        measure_code, "workbook", BENCHMARK_RULES, tmp_path / "workbook.xlsx"
+    )
+    write_only = measure(
+        measure_code, "stream", BENCHMARK_RULES, tmp_path / "write_only.xlsx"
+    )
+    record_property("workbook", workbook)
+    record_property("write_only", write_only)
+
+    assert write_only["peak_mb"] < workbook["peak_mb"]
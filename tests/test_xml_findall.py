@@ -0,0 +1,64 @@
+"""Test XML path selectors."""
+# Copyright © 2022 Appropriate Solutions, Inc. All rights reserved.
+
+import pytest
+from lxml import etree
+
+from netgate_xml_to_xlsx.errors import NodeError
+from netgate_xml_to_xlsx.plugins.support.elements import (
+    compile_selector,
+    xml_findall,
+    xml_findone,
+)
+
+xml = """\
+<pfsense>
+    <filter>
+        <rule><descr>one</descr><pre-shared-key>a</pre-shared-key></rule>
+        <!-- comment -->
+        <rule><descr>two</descr><descr>three</descr></rule>
+    </filter>
+</pfsense>
+"""
+
+
+@pytest.mark.parametrize(
+    "el_path,expected",
+    (
+        ("pfsense", []),
+        ("filter", ["filter"]),
+        ("pfsense,filter,rule", ["rule", "rule"]),
+        ("filter,rule,descr", ["descr", "descr", "descr"]),
+        ("filter/rule/pre-shared-key", ["pre-shared-key"]),
+        ("missing", []),
+    ),
+)
+def test_xml_findall(el_path, expected):
+    parsed_xml = etree.XML(xml)
+
+    assert [x.tag for x in xml_findall(parsed_xml, el_path)] == expected
+
+
+def test_xml_findone():
+    rules = xml_findall(etree.XML(xml), "filter,rule")
+
+    assert xml_findone(rules[0], "descr").text == "one"
+    assert xml_findone(rules[0], "missing") is None
+    with pytest.raises(NodeError):
+        xml_findone(rules[1], "descr")
+
+
+def test_invalid_selector():
+    with pytest.raises(NodeError):
+        xml_findall(etree.XML(xml), "filter,[")
+
+
+def test_selector_cache():
+    parsed_xml = etree.XML(xml)
+    compile_selector.cache_clear()
+
+    for _ in range(3):
+        xml_findall(parsed_xml, "filter,rule")
+
+    info = compile_selector.cache_info()
+    assert (info.hits, info.misses) == (2, 1)